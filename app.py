@@ -1,16 +1,26 @@
+import time
+_script_start = time.perf_counter()
+
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from streamlit_plotly_events import plotly_events
-import plotly.io as pio
-pio.templates.default = "plotly"
-from streamlit_echarts import st_echarts
 from streamlit.components.v1 import html
-from pyecharts.commons.utils import JsCode
 
 import numpy as np
 import pandas as pd
-from data_ingestion import load_transform_data,load_comp_data_from_db
+from data_ingestion import (
+    load_pending_page_from_db, count_pending_in_db,
+    load_table_page_from_db, count_table_rows_in_db, load_row_from_db, TABLE_SORT_EXPRESSIONS, DISPLAY_COLUMNS,
+)
+from dataset_cache import (
+    get_dataset, get_pending_page, get_pending_count, bump_dataset_version, dataset_version,
+    sql_filter_mode, get_filter_options, get_filtered_dataset,
+)
+import notifications
+import migrate
+from db import pooled_connection, pool_stats
+from chart_options import get_scatter_option, chart_cache_stats
+from marker_size import SCALES as MARKER_SCALES
+from record_store import get_record
+from moderation import approve_submissions, reject_submissions, refresh_approved_view, refresh_approved_view_on_start
 import math
 
 import os
@@ -20,11 +30,19 @@ import psycopg2
 import psycopg2.extras
 from psycopg2.extras import RealDictCursor
 
-from captcha.image import ImageCaptcha
 import random, string
 from datetime import datetime
-import time
 from urllib.parse import urlparse
+import startup
+
+# Heavy modules are imported on first use (see startup.lazy_import). st.tabs runs
+# every tab body on every run, so ECharts and captcha still load on the first run;
+# only modules behind a condition are really deferred: openpyxl (sheet source)
+# and pyecharts (log-scale axes). The JS navigation relies on st.tabs, so the
+# tabs stay.
+HEAVY_MODULES = ["streamlit_echarts", "pyecharts.commons.utils", "captcha.image", "openpyxl"]
+startup.preload(HEAVY_MODULES)
+startup.record_once("app imports", time.perf_counter() - _script_start)
 
 # Loading environment variables
 load_dotenv()
@@ -36,6 +54,16 @@ if "logged_in" not in st.session_state:
 # Setting the wide page format
 st.set_page_config(layout="wide")
 
+# Bring the schema up to date (DB_MIGRATE=1)
+migrate.migrate_on_start()
+
+# Catch up on writes made while DB_APPROVED_VIEW was off
+refresh_approved_view_on_start()
+
+# Follow writes made by other worker processes
+if notifications.listen_enabled():
+    notifications.start_listener()
+
 def is_nan_or_nan_string(val):
     # Check for actual NaN
     if isinstance(val, float) and math.isnan(val):
@@ -49,13 +77,11 @@ def is_nan_or_nan_string(val):
 
 # --- PostgreSQL connection ---
 def get_connection():
-    return psycopg2.connect(
-        host="localhost",
-        database=os.getenv("DB_NAME"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        port="5432"
-    )
+    """
+    Checks a connection out of the shared pool. Use as a context manager;
+    the connection goes back to the pool on exit.
+    """
+    return pooled_connection()
 
 
 def df_to_json_safe(df: pd.DataFrame):
@@ -82,18 +108,23 @@ def is_hyperlink(s):
 # Check credentials for admin and user
 def check_credentials(username, password,table):
     try:
-        conn = get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        query = f"SELECT * FROM {table} WHERE username = %s AND password = %s"
-        cur.execute(query, (username, password))
-        user = cur.fetchone()
-        cur.close()
-        conn.close()
+        with get_connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            query = f"SELECT * FROM {table} WHERE username = %s AND password = %s"
+            cur.execute(query, (username, password))
+            user = cur.fetchone()
+            cur.close()
         return user is not None
     except Exception as e:
         st.error(f"Database error: {e}")
         return False
     
+# Page sizes offered in the moderation queue; MODERATION_PAGE_SIZE sets the default
+QUEUE_PAGE_SIZES = [10, 25, 50, 100]
+QUEUE_PAGE_SIZE = int(os.getenv("MODERATION_PAGE_SIZE", "25"))
+# Rows per page of the admin "View Data Tables" grid
+TABLE_PAGE_SIZE = int(os.getenv("ADMIN_TABLE_PAGE_SIZE", "50"))
+
 def admin_interface():
     # --- Initialize page state ---
     if "admin_page" not in st.session_state:
@@ -114,6 +145,11 @@ def admin_interface():
         st.session_state.logged_in = "app"
         st.rerun()
 
+    with st.sidebar.expander("Connection pool"):
+        st.json(pool_stats())
+    with st.sidebar.expander("Chart cache"):
+        st.json(chart_cache_stats())
+
     # --- Main content based on sidebar tab selection ---
     # if st.session_state.admin_page == "User Table":
     #     st.header("👥 Manage Users")
@@ -158,23 +194,49 @@ def admin_interface():
     #         st.error(f"Error loading users: {e}")
         
     if st.session_state.admin_page == "Database":
-        conn = get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM quant_data ORDER BY id DESC")
-        data = cur.fetchall()
-        cur.close()
-        conn.close()
-        df_all = pd.DataFrame(data)
-        st.dataframe(df_all)
-        df_ids = df_all["id"].unique()
-        id_selected= st.selectbox("Select the id",df_ids)
-        operations = st.selectbox("Select the operation to be performed",['Delete','Update'])
-
-        # Initialize session state variables
-        if "delete_requested" not in st.session_state:
+        # Keyset pagination: the stack holds the (sort key, id) cursor of every page visited
+        if "table_pages" not in st.session_state:
+            st.session_state.table_pages = [None]
+        reset_pages = lambda: st.session_state.update(table_pages=[None])
+
+        f1, f2, f3, f4 = st.columns([4, 2, 2, 1])
+        search = f1.text_input("Search reference, institution or computer", on_change=reset_pages).strip()
+        status_filter = f2.selectbox("Status", ["All", "APPROVED", "PENDING", "UPDATE REQUESTED"], on_change=reset_pages)
+        sort_column = f3.selectbox("Sort by", list(TABLE_SORT_EXPRESSIONS), on_change=reset_pages)
+        descending = f4.checkbox("Descending", value=True, on_change=reset_pages)
+        status = None if status_filter == "All" else status_filter
+        after = st.session_state.table_pages[-1]
+
+        with get_connection() as conn:
+            total, exact = count_table_rows_in_db(conn, search, status)
+            data = load_table_page_from_db(conn, sort_column, descending, search, status, after, TABLE_PAGE_SIZE)
+
+        page_number = len(st.session_state.table_pages)
+        approx = "" if exact else "about "
+        st.caption(f"{approx}{total} row(s) — page {page_number} of {approx}{max(1, -(-total // TABLE_PAGE_SIZE))}")
+        st.dataframe(pd.DataFrame(data).drop(columns=["sort_key"], errors="ignore"), hide_index=True, use_container_width=True)
+
+        prev_col, next_col = st.columns(2)
+        if prev_col.button("⬅️ Previous page", disabled=page_number == 1):
+            st.session_state.table_pages.pop()
+            st.rerun()
+        if next_col.button("Next page ➡️", disabled=len(data) < TABLE_PAGE_SIZE):
+            st.session_state.table_pages.append((data[-1]["sort_key"], data[-1]["id"]))
+            st.rerun()
+
+        id_selected = st.number_input("Record id", min_value=1, step=1, value=int(data[0]["id"]) if data else 1)
+        with get_connection() as conn:
+            selected_row = load_row_from_db(conn, id_selected)
+        # Initialize session state variables; a pending deletion only applies to the id it was requested for
+        if "delete_requested" not in st.session_state or st.session_state.get("delete_id") != id_selected:
             st.session_state.delete_requested = False
-        if "delete_confirmed" not in st.session_state:
             st.session_state.delete_confirmed = False
+            st.session_state.delete_id = id_selected
+
+        if selected_row is None:
+            st.warning(f"No record with id {id_selected}.")
+            return
+        operations = st.selectbox("Select the operation to be performed",['Delete','Update'])
 
         if operations == "Delete":
             # Step 1: User clicks "Delete Record"
@@ -196,17 +258,19 @@ def admin_interface():
 
             # Step 3: Actually delete the record
             if st.session_state.delete_confirmed:
-                conn = get_connection()
-                cur = conn.cursor(cursor_factory=RealDictCursor)
-                cur.execute("DELETE FROM quant_data WHERE id = %s", (int(id_selected),))
-                conn.commit()
-                cur.close()
-                conn.close()
+                with get_connection() as conn:
+                    cur = conn.cursor(cursor_factory=RealDictCursor)
+                    cur.execute("DELETE FROM quant_data WHERE id = %s", (int(id_selected),))
+                    conn.commit()
+                    cur.close()
+                    refresh_approved_view(conn)
+                bump_dataset_version()
+                # Reset now: the next record must be confirmed again
+                st.session_state.delete_requested = False
+                st.session_state.delete_confirmed = False
                 st.success("✅ Successfully deleted the record.")
 
                 if st.button("🔄 Click to refresh and see updates"):
-                    st.session_state.delete_requested = False
-                    st.session_state.delete_confirmed = False
                     st.rerun()
 
                 
@@ -217,28 +281,10 @@ def admin_interface():
 
         if operations == "Update":
             
-            df_all['Computations'] = df_all['computation'].apply(
-                lambda x: ', '.join(x) if isinstance(x, list) else ''
-                )
+            record = {DISPLAY_COLUMNS.get(k, k): v for k, v in selected_row.items()}
+            record['Computations'] = ', '.join(record['Computation']) if isinstance(record['Computation'], list) else ''
 
-            df_all = df_all.rename(columns={
-                'reference': 'Reference',
-                'date': 'Date',
-                'computation': 'Computation',
-                'num_qubits': 'Number of qubits',
-                'num_2q_gates': 'Number of two-qubit gates',
-                'num_1q_gates': 'Number of single-qubit gates',
-                'total_gates':'Total number of gates',
-                'circuit_depth':'Circuit depth',
-                'circuit_depth_measure':'Circuit depth measure',
-                'institution':'Institution',
-                'computer':	'Computer',	
-                })
-            
-            record = df_all[df_all['id'] == id_selected]
-            if not record.empty:
-            
-                record = record.iloc[0]
+            if record:
 
                 ref = st.text_input("Reference", value=record['Reference'])
 
@@ -299,47 +345,48 @@ def admin_interface():
                         error_count_a+=1
                         st.error("Please fill out Computer as it is a required field. ")
                     if error_count_a == 0:
-                        conn = get_connection()
-                        cursor = conn.cursor()
-                        status = "APPROVED"
-
-                        cursor.execute("""
-                            UPDATE quant_data SET
-                                reference = %s,
-                                date = %s,
-                                computation = %s,
-                                num_qubits = %s,
-                                num_2q_gates = %s,
-                                num_1q_gates = %s,
-                                total_gates = %s,
-                                circuit_depth = %s,
-                                circuit_depth_measure = %s,
-                                institution = %s,
-                                computer = %s,
-                                status = %s,
-                                feedback = %s
-                            WHERE id = %s
-                        """, (
-                            ref,
-                            new_date,
-                            psycopg2.extras.Json(computation_list),
-                            new_qubits,
-                            new_num_2q_gates,
-                            new_num_1q_gates,
-                            new_total_gates,
-                            new_circuit_depth,
-                            new_circuit_depth_measure,
-                            new_institution,
-                            new_computer,
-                            status,
-                            new_feedback,
-                            int(record["id"]))
-                        )
+                        with get_connection() as conn:
+                            cursor = conn.cursor()
+                            status = "APPROVED"
+
+                            cursor.execute("""
+                                UPDATE quant_data SET
+                                    reference = %s,
+                                    date = %s,
+                                    computation = %s,
+                                    num_qubits = %s,
+                                    num_2q_gates = %s,
+                                    num_1q_gates = %s,
+                                    total_gates = %s,
+                                    circuit_depth = %s,
+                                    circuit_depth_measure = %s,
+                                    institution = %s,
+                                    computer = %s,
+                                    status = %s,
+                                    feedback = %s
+                                WHERE id = %s
+                            """, (
+                                ref,
+                                new_date,
+                                psycopg2.extras.Json(computation_list),
+                                new_qubits,
+                                new_num_2q_gates,
+                                new_num_1q_gates,
+                                new_total_gates,
+                                new_circuit_depth,
+                                new_circuit_depth_measure,
+                                new_institution,
+                                new_computer,
+                                status,
+                                new_feedback,
+                                int(record["id"]))
+                            )
                         
 
-                        conn.commit()
-                        cursor.close()
-                        conn.close()
+                            conn.commit()
+                            cursor.close()
+                            refresh_approved_view(conn)
+                        bump_dataset_version()
 
                         st.success(f"Update done for ID : {record['id']}")
 
@@ -355,74 +402,82 @@ def admin_interface():
     if st.session_state.admin_page == "Data Table":
         st.header("📈 Submissions Graph Data")
         try:
-            conn = get_connection()
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            cur.execute("SELECT * FROM quant_data where status IN ('PENDING','UPDATE REQUESTED') ORDER BY id DESC")
-            data = cur.fetchall()
-            cur.close()
-            conn.close()
-            df_data = pd.DataFrame(data)
+            # Keyset pagination: the stack holds the "before id" cursor of every page visited
+            if "queue_pages" not in st.session_state:
+                st.session_state.queue_pages = [None]
+            page_size = st.selectbox(
+                "Rows per page", QUEUE_PAGE_SIZES,
+                index=QUEUE_PAGE_SIZES.index(QUEUE_PAGE_SIZE) if QUEUE_PAGE_SIZE in QUEUE_PAGE_SIZES else 1,
+                on_change=lambda: st.session_state.update(queue_pages=[None]),
+            )
+            before_id = st.session_state.queue_pages[-1]
+
+            # The cached queue is only trusted when other workers' writes are heard
+            if notifications.listen_enabled():
+                total = get_pending_count()
+                data = get_pending_page(before_id, page_size)
+            else:
+                with get_connection() as conn:
+                    total = count_pending_in_db(conn)
+                    data = load_pending_page_from_db(conn, before_id, page_size)
+
+            if not data and before_id is not None:
+                # The page emptied (e.g. after moderating its last rows): go back one page
+                st.session_state.queue_pages.pop()
+                st.rerun()
+
+            # Outcome of the last bulk action, shown after its rerun
+            if "queue_message" in st.session_state:
+                level, message = st.session_state.pop("queue_message")
+                getattr(st, level)(message)
 
             if not data:
                 st.info("✅ No pending submissions.")
             else:
-                for index,row in df_data.iterrows():
-                    with st.container():
-                        st.markdown("---")
-                        col1, col2 = st.columns([8, 2])
-
-                        with col1:
-                            # st.markdown(f"**ID:** `{row['id']}`")
-                            # st.markdown(f"**Reference:** {row['reference']}")
-                            # st.markdown(f"**Date:** {row['date']}")
-                            # st.markdown(f"**Computation:** {row['computation']}")
-                            # st.markdown(f"**Qubits:** {row['num_qubits']}")
-                            # st.markdown(f"**2-Qubit Gates:** {row['num_2q_gates']}")
-                            # st.markdown(f"**1-Qubit Gates:** {row['num_1q_gates']}")
-                            # st.markdown(f"**Total Gates:** {row['total_gates']}")
-                            # st.markdown(f"**Circuit Depth:** {row['circuit_depth']}")
-                            # st.markdown(f"**Depth (Measured):** {row['circuit_depth_measure']}")
-                            # st.markdown(f"**Institution:** {row['institution']}")
-                            # st.markdown(f"**Computer:** {row['computer']}")
-                            # st.markdown(f"**Error Mitigation:** {row['error_mitigation']}")
-                            # st.markdown(f"**Status:** `{row['status']}`")
-                            if row["status"]=="PENDING":
-                                st.markdown("New Datapoint")
-                                st.table(row)
-                            else:
-                                st.markdown("Update Datapoint")
-                                st.markdown(f"**Comments:** <span style='color:green'>{row['feedback']}</span>", unsafe_allow_html=True)
-                                st.table(row)
-                            
+                page_number = len(st.session_state.queue_pages)
+                st.caption(f"{total} pending submission(s) — page {page_number} of {max(1, -(-total // page_size))}")
+
+                df_page = pd.DataFrame(data)
+                df_page.insert(0, "select", False)
+                df_page.insert(2, "kind", np.where(df_page["status"] == "PENDING", "New Datapoint", "Update Datapoint"))
+                edited = st.data_editor(
+                    df_page.drop(columns=["status"]),
+                    hide_index=True,
+                    use_container_width=True,
+                    disabled=[c for c in df_page.columns if c != "select"],
+                    column_config={"select": st.column_config.CheckboxColumn("✔", default=False)},
+                    # A new key after every write clears the selection
+                    key=f"queue_{before_id}_{page_size}_{dataset_version()}",
+                )
+                selected_ids = [int(i) for i in edited.loc[edited["select"], "id"]]
+
+                c1, c2, _ = st.columns([2, 2, 6])
+                if c1.button(f"✅ Approve selected ({len(selected_ids)})", disabled=not selected_ids):
+                    with get_connection() as conn:
+                        approved = approve_submissions(conn, selected_ids)
+                    bump_dataset_version()
+                    skipped = sorted(set(selected_ids) - set(approved))
+                    message = f"Approved ID(s) {', '.join(map(str, approved))}"
+                    if skipped:
+                        message += (f"; left in the queue: {', '.join(map(str, skipped))}"
+                                    " (no longer queued, or another selected submission has the same reference)")
+                    st.session_state.queue_message = ("warning" if skipped else "success", message)
+                    st.rerun()
+
+                if c2.button(f"❌ Reject selected ({len(selected_ids)})", disabled=not selected_ids):
+                    with get_connection() as conn:
+                        rejected = reject_submissions(conn, selected_ids)
+                    bump_dataset_version()
+                    st.session_state.queue_message = ("warning", f"Rejected ID(s) {', '.join(map(str, rejected))}")
+                    st.rerun()
 
-                        with col2:
-                            c1, c2 = st.columns(2)
-                            if c1.button("✅ Approve", key=f"approve_{row['id']}"):
-                                conn = get_connection()
-                                cur = conn.cursor()
-
-                                if row['status']=='PENDING':
-                                    cur.execute("UPDATE quant_data SET status = 'APPROVED' WHERE id = %s", (row['id'],))
-                                else:
-                                    cur.execute("DELETE from quant_data WHERE reference= %s and status= 'APPROVED'", (row['reference'],))
-                                    conn.commit()
-                                    cur.execute("UPDATE quant_data SET status = 'APPROVED' WHERE id = %s", (row['id'],))
-
-                                conn.commit()
-                                cur.close()
-                                conn.close()
-                                st.success(f"Approved ID {row['id']}")
-                                st.rerun()
-
-                            if c2.button("❌ Reject", key=f"reject_{row['id']}"):
-                                conn = get_connection()
-                                cur = conn.cursor()
-                                cur.execute("DELETE from quant_data WHERE id = %s", (row['id'],))
-                                conn.commit()
-                                cur.close()
-                                conn.close()
-                                st.warning(f"Rejected ID {row['id']}")
-                                st.rerun()
+                prev_col, next_col = st.columns(2)
+                if prev_col.button("⬅️ Previous page", disabled=page_number == 1):
+                    st.session_state.queue_pages.pop()
+                    st.rerun()
+                if next_col.button("Next page ➡️", disabled=len(data) < page_size):
+                    st.session_state.queue_pages.append(data[-1]["id"])
+                    st.rerun()
 
         except Exception as e:
             st.error(f"Database error: {e}")
@@ -849,8 +904,6 @@ def show_login_form():
     
    
 
-    data_source = os.getenv('DATA_SOURCE')
-
     # define the costant
     length_captcha = 4
     width = 200
@@ -864,41 +917,39 @@ def show_login_form():
         circuit_depth, circuit_depth_measure, institution, computer
     ):
         try:
-            conn = get_connection()
-    
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO quant_data (
-                    reference, date, computation,
-                    num_qubits, num_2q_gates, num_1q_gates, total_gates,
-                    circuit_depth, circuit_depth_measure,
-                    institution, computer
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                reference,
-                date,
-                psycopg2.extras.Json(computation),
-                num_qubits,
-                num_2q_gates,
-                num_1q_gates,
-                total_gates,
-                circuit_depth,
-                circuit_depth_measure,
-                institution,
-                computer
-            ))
-            
-            conn.commit()
+            with get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    INSERT INTO quant_data (
+                        reference, date, computation,
+                        num_qubits, num_2q_gates, num_1q_gates, total_gates,
+                        circuit_depth, circuit_depth_measure,
+                        institution, computer
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, (
+                    reference,
+                    date,
+                    psycopg2.extras.Json(computation),
+                    num_qubits,
+                    num_2q_gates,
+                    num_1q_gates,
+                    total_gates,
+                    circuit_depth,
+                    circuit_depth_measure,
+                    institution,
+                    computer
+                ))
+                
+                conn.commit()
+                cursor.close()
+            bump_dataset_version()
             
             return True
         except Exception as e:
             st.error(f"Database Error: {e}")
             return False
-        finally:
-            cursor.close()
-            conn.close()
     with tab1:
         # Page title
 
@@ -956,7 +1007,10 @@ def show_login_form():
     with tab2:
         
         #st.header("Visual Analysis")
-        df = load_transform_data('db')
+        st_echarts = startup.lazy_import("streamlit_echarts").st_echarts
+        filter_in_sql = sql_filter_mode()
+        # In SQL filter mode only the filter choices are loaded up front
+        df = get_filter_options() if filter_in_sql else get_dataset('db')
 
             # Create two columns
         col1, col2 = st.columns([1, 2])  # You can adjust the ratio as needed
@@ -975,6 +1029,9 @@ def show_login_form():
             years = sorted(df['Year'].dropna().unique())
             selected_years = st.multiselect("Year", years, default=years)
 
+            if filter_in_sql:
+                df = get_filtered_dataset(selected_comps, selected_computers, selected_years)
+
             # Error mitigation filter
             # Flatten the list and get unique values
             #unique_items = set(item for sublist in df['Error mitigation'] for item in sublist)
@@ -1010,15 +1067,7 @@ def show_login_form():
             b_axis = st.selectbox("Marker size", b_options)
             if b_axis == 'Date (more recent = larger)':
                 b_axis = 'Date'
-
-            if b_axis == 'Date':
-                date_min = df['Date'].min()
-                date_max = df['Date'].max()
-                df['bubble_size'] = df['Date'].apply(lambda x: (x - date_min).days / (date_max - date_min).days if pd.notnull(x) else None)
-
-                # Scale to a desired range (e.g., 10–60)
-                df['bubble_size'] = df['bubble_size'] * 50 + 10  # range from 10 to 60
-                b_axis = 'bubble_size'
+            b_axis_scale = st.selectbox("Marker scale", MARKER_SCALES, index=0)
 
             col5,col6 = st.columns(2)
 
@@ -1027,143 +1076,13 @@ def show_login_form():
             with col6:
                 y_axis_scale = st.selectbox("Y-axis scale", ["Linear", "Log"], index=0)
         
-        if data_source == 'sheet':
-        # Filter DataFrame
-            filtered_df = df[
-                (df['Institution'].isin(selected_comps)) &
-                (df['Computer'].isin(selected_computers)) &
-                (df['Year'].isin(selected_years)) 
-                # &
-                # (
-                #     df['Error mitigation'].isin(selected_errors) |
-                #     df['Error mitigation_1'].isin(selected_errors) |
-                #     df['Error mitigation_2'].isin(selected_errors) |
-                #     df['Error mitigation_3'].isin(selected_errors)
-                # )
-            ]
-        else:
-             # Filter DataFrame
-            filtered_df = df[
-                (df['Institution'].isin(selected_comps)) &
-                (df['Computer'].isin(selected_computers)) &
-                (df['Year'].isin(selected_years)) 
-                # &
-                # (
-                #       df['Error mitigation'].apply(
-                #      lambda x: bool(set(x) & set(selected_errors)) if isinstance(x, list) else False
-                #      )
-                
-                # )
-            ]
-
-        
-        filtered_df = filtered_df.dropna(subset=[b_axis])
-
-        
-
-        
-
-       
-
-        # Assume filtered_df, y_axis, b_axis are already defined
+        # Assume df, y_axis, b_axis are already defined
         with col2:
-        
-
-            graph_df = filtered_df.copy()
-            
-            # if x_axis_scale == 'Log':
-            #     graph_df['Number of qubits'] = np.log(graph_df['Number of qubits'].replace(0, np.nan).dropna())
-            # if y_axis_scale == 'Log':
-            #     graph_df[y_axis] = np.log(graph_df[y_axis].replace(0, np.nan).dropna())
-
-            graph_df["Date"] = graph_df["Date"].astype(str)
-            graph_df_numeric = graph_df.select_dtypes(include='number')
-            graph_df[graph_df_numeric.columns] = graph_df_numeric.fillna(0)
-
-            graph_df_category = graph_df.select_dtypes(exclude='number')
-            graph_df[graph_df_category.columns] = graph_df_category.fillna('')
-
-            
-
-            x_index = graph_df.columns.get_loc("Number of qubits")
-            y_index = graph_df.columns.get_loc(y_axis)
-
-            
-            graph_df["Comp_Inst"] = graph_df["Institution"] + " " + graph_df["Computer"]
-            computers = list(graph_df["Comp_Inst"].unique())
-
-            comp_index = graph_df.columns.get_loc("Comp_Inst")
-
-            bubble_index = graph_df.columns.get_loc(b_axis)
-            min_value = graph_df.iloc[:, bubble_index].min()
-            max_value = graph_df.iloc[:, bubble_index].max()
-
-            min_value = 0 if pd.isna(min_value) else min_value
-            max_value = 0 if pd.isna(max_value) else max_value
-
-
-            bubble_index = int(bubble_index)
-            min_value = float(min_value) if min_value is not None else 0
-            max_value = float(max_value) if max_value is not None else 0
-
-
-            option = {
-                "dataset": [
-                    {"source": [graph_df.columns.tolist()] + graph_df.values.tolist()}
-                ] + [
-                    {"transform": {"type": "filter", "config": {"dimension": comp_index, "eq": i}}}
-                    for i in computers
-                ],
-                "title": {
-                    #"text": "Quantum Points",
-                   # "subtext": "Please click on the datapoint you would like to update.",
-                    #"sublink": "https://count.quops.com",
-                    "left": "center"
-                },
-                "legend": {"data": computers, "bottom": 1},
-                "tooltip": {"trigger": "item","confine":True,"appendToBody":True},
-                "xAxis": {"type": "log" if x_axis_scale == "Log" else "value", "splitLine": {"lineStyle": {"type": "dashed"}},"min": 1,
-                          "name": "Number of qubits",         
-                          "nameLocation": "middle",          
-                          "nameGap": 30 ,
-                           "axisLabel": {
-            "formatter": JsCode(
-                # one-line JS required
-                "function (val) { var e = Math.log10(val); var map = {'0':'⁰','1':'¹','2':'²','3':'³','4':'⁴','5':'⁵','6':'⁶','7':'⁷','8':'⁸','9':'⁹','-':'⁻'}; return '10' + e.toString().split('').map(function(c){return map[c]||c}).join(''); }"
-            ).js_code if x_axis_scale == "Log" else "{value}"  # this makes labels show as powers of 10
-        }
-   },
-                "yAxis": {"type": "log" if y_axis_scale == "Log" else "value", "splitLine": {"lineStyle": {"type": "dashed"}},"min": 1,
-                          "name": y_axis,         
-                         "nameLocation": "middle",          
-                         "nameGap": 50 ,
-                          "axisLabel": {
-            "formatter": JsCode(
-                # one-line JS required
-                "function (val) { var e = Math.log10(val); var map = {'0':'⁰','1':'¹','2':'²','3':'³','4':'⁴','5':'⁵','6':'⁶','7':'⁷','8':'⁸','9':'⁹','-':'⁻'}; return '10' + e.toString().split('').map(function(c){return map[c]||c}).join(''); }"
-            ).js_code if y_axis_scale == "Log" else "{value}"  # this makes labels show as powers of 10
-        }
-                    
-                       
-   },
-                "visualMap": {
-                    "show": False,
-                    "dimension": bubble_index,
-                    "min": min_value,
-                    "max": max_value,
-                    "seriesIndex": list(range(len(computers))),
-                    "inRange": {"symbolSize": [50, 120]}
-                },
-                "series": [
-                    {
-                        "name": comp,
-                        "type": "scatter",
-                        "datasetIndex": idx + 1,  # important: dataset index matches filter
-                        "encode": {"x": x_index, "y": y_index, "tooltip": [1, 2,4, 5,6,7,8,9,10,11,14]}
-                    }
-                    for idx, comp in enumerate(computers)
-                ]
-            }
+            # Memoized: filtering, NaN filling and the dataset JSON only run on a miss
+            option = get_scatter_option(
+                df, selected_comps, selected_computers, selected_years,
+                y_axis, b_axis, x_axis_scale, y_axis_scale, b_axis_scale
+            )
 
             last_row = st.container()
             clicked_id = None
@@ -1204,9 +1123,12 @@ def show_login_form():
                     """,
                     unsafe_allow_html=True,
                 )
-                update_ref = graph_df.loc[graph_df["id"]==st.session_state.clicked_id,"Reference"].values[0]
+                clicked_record = get_record(df, st.session_state.clicked_id)
 
-                if last_row.button(f"Update data for reference {update_ref}"):
+                if clicked_record is None:
+                    # Deleted or no longer approved since the chart was drawn
+                    last_row.info("This datapoint is no longer available. Please refresh the page.")
+                elif last_row.button(f"Update data for reference {clicked_record['Reference']}"):
                     ts = int(time.time() * 1000)
                     html(f"<script>{switch(3)} // trigger for id {clicked_id} at {ts}</script>", height=0)
             elif clicked_id is not None and isinstance(clicked_id,str):
@@ -1255,10 +1177,7 @@ def show_login_form():
        
     #     st.header("Computer Overview")
     #     if os.getenv("DATA_SOURCE")=='sheet':     
-    #         sheet_id = os.getenv('SHEET_ID')
-    #         url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=xlsx"
-    #         df_comp = pd.read_excel(url,sheet_name= 1,header=1)
-    #         df_comp.drop('Unnamed: 0',axis=1,inplace=True)
+    #         df_comp = load_comp_data_from_sheet(os.getenv('SHEET_ID'))
     #     else:  
     #         df_comp = load_comp_data_from_db()
 
@@ -1294,6 +1213,7 @@ def show_login_form():
             if 'Captcha' not in st.session_state:
                 st.session_state['Captcha'] = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length_captcha))
 
+            ImageCaptcha = startup.lazy_import("captcha.image").ImageCaptcha
             image = ImageCaptcha(width=width, height=height)
             data = image.generate(st.session_state['Captcha'])
             col1.image(data)
@@ -1425,18 +1345,16 @@ def show_login_form():
         
         if st.session_state.clicked_id is None:
             st.subheader("Please provide the necessary details…")
-            update_id = df.iloc[0]["id"]
+            update_id = df.iloc[0]["id"] if not df.empty else None
         else:
             st.subheader("Please provide the necessary details…")
             update_id = st.session_state.clicked_id
             st.session_state.visited = 1
         
         
-        record = df[df['id'] == update_id]
+        record = get_record(df, update_id)
 
-        if not record.empty:
-        
-            record = record.iloc[0]
+        if record is not None:
 
             new_ref = st.text_input("Reference",value = record["Reference"],help = "The reference for the quantum computation, typically an arXiv or journal link")
             new_date = st.date_input("Date", value=record['Date'])
@@ -1484,6 +1402,7 @@ def show_login_form():
             if "update_captcha" not in st.session_state:
                 st.session_state.update_captcha = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length_captcha))
 
+            ImageCaptcha = startup.lazy_import("captcha.image").ImageCaptcha
             image1 = ImageCaptcha(width=width, height=height)
             data1 = image1.generate(st.session_state.update_captcha)
             col3.image(data1)
@@ -1515,37 +1434,37 @@ def show_login_form():
                     
                     #if reference and num_qubits and (num_2q_gates or total_gates):
                     if error_count==0:
-                        conn = get_connection()
-                        cursor = conn.cursor()
-                        status = "UPDATE REQUESTED"
-
-                        cursor.execute("""
-                            INSERT INTO quant_data (
-                                reference, date, computation,
-                                num_qubits, num_2q_gates, num_1q_gates, total_gates,
-                                circuit_depth, circuit_depth_measure,
-                                institution, computer, status, feedback
-                            )
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """, (
-                            new_ref,
-                            new_date,
-                            psycopg2.extras.Json(computation_list),
-                            new_qubits,
-                            new_num_2q_gates,
-                            new_num_1q_gates,
-                            new_total_gates,
-                            new_circuit_depth,
-                            new_circuit_depth_measure,
-                            new_institution,
-                            new_computer,
-                            status,
-                            new_feedback
-                        ))
-
-                        conn.commit()
-                        cursor.close()
-                        conn.close()
+                        with get_connection() as conn:
+                            cursor = conn.cursor()
+                            status = "UPDATE REQUESTED"
+
+                            cursor.execute("""
+                                INSERT INTO quant_data (
+                                    reference, date, computation,
+                                    num_qubits, num_2q_gates, num_1q_gates, total_gates,
+                                    circuit_depth, circuit_depth_measure,
+                                    institution, computer, status, feedback
+                                )
+                                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                            """, (
+                                new_ref,
+                                new_date,
+                                psycopg2.extras.Json(computation_list),
+                                new_qubits,
+                                new_num_2q_gates,
+                                new_num_1q_gates,
+                                new_total_gates,
+                                new_circuit_depth,
+                                new_circuit_depth_measure,
+                                new_institution,
+                                new_computer,
+                                status,
+                                new_feedback
+                            ))
+
+                            conn.commit()
+                            cursor.close()
+                        bump_dataset_version()
 
                         st.success(f"Update request submitted: {record['Reference']}")
                         del st.session_state.update_captcha  # Reset captcha after success
@@ -1553,6 +1472,8 @@ def show_login_form():
                     st.error("🚨 Invalid Captcha")
                     del st.session_state.update_captcha
                     st.rerun()
+        elif update_id is not None:
+            st.info("The selected datapoint is no longer available. Please pick another one in the Visualization tab.")
 
     with tab5:
   
@@ -1591,12 +1512,17 @@ def show_login_form():
 # if st.session_state.logged_in == 'refresh':
 #     #show_user_app()
 #     show_login_form()
-if st.session_state.logged_in == 'app':
-    #show_user_app()
-    show_login_form()
-elif st.session_state.logged_in == 'admin':
-    admin_interface()
-else:
-    show_login_form()
+with startup.timed_once("first render"):
+    if st.session_state.logged_in == 'app':
+        #show_user_app()
+        show_login_form()
+    elif st.session_state.logged_in == 'admin':
+        admin_interface()
+    else:
+        show_login_form()
+
+if startup.report_enabled():
+    with st.sidebar.expander("Startup report"):
+        st.table(startup.startup_report())
 
 
@@ -0,0 +1,177 @@
+"""
+Benchmark of the Visualization scatter with pre-partitioned datasets against
+the previous layout (one full source plus one filter transform per computer).
+
+For each number of rows and computers it builds the chart option both ways
+and reports build time and JSON size, once with every point sent (budget 0,
+which is what "as rows scale" measures) and once thinned to the default
+CHART_POINT_BUDGET, so the cost of downsampling and its savings show
+separately. With playwright installed
+(`pip install playwright && playwright install chromium`) it also renders
+both options with ECharts in headless Chromium and reports the time from
+setOption until the chart has finished rendering.
+
+Usage:
+    python benchmarks/bench_chart_render.py [--rows 1000 10000 100000] [--computers 5 20 50]
+        [--budgets 0 5000] [--repeat 3] [--echarts URL_OR_PATH]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import chart_options  # noqa: E402
+from chart_options import build_scatter_option, payload_size  # noqa: E402
+
+ECHARTS_URL = "https://cdn.jsdelivr.net/npm/echarts@5/dist/echarts.min.js"
+
+RENDER_JS = """
+async (option) => {
+    const el = document.getElementById('chart');
+    const chart = echarts.init(el, null, {renderer: 'canvas'});
+    const done = new Promise(resolve => chart.on('finished', resolve));
+    const start = performance.now();
+    chart.setOption(option);
+    await done;
+    const elapsed = performance.now() - start;
+    chart.dispose();
+    return elapsed;
+}
+"""
+
+
+def synthetic_dataset(rows: int, computers: int, seed: int = 0) -> pd.DataFrame:
+    """Rows shaped like the transformed dataset, spread over `computers` institution/computer pairs."""
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(0, computers, rows)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'Reference': [f'https://arxiv.org/abs/{i}' for i in range(rows)],
+        'Date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, rows), 'D'),
+        'Computation': 'VQE',
+        'Number of qubits': rng.integers(1, 1000, rows).astype(float),
+        'Number of two-qubit gates': rng.integers(1, 10**6, rows).astype(float),
+        'Number of single-qubit gates': rng.integers(1, 10**6, rows).astype(float),
+        'Total number of gates': rng.integers(1, 10**6, rows).astype(float),
+        'Circuit depth': rng.integers(1, 10**4, rows).astype(float),
+        'Circuit depth measure': 'two-qubit layers',
+        'Institution': [f'Institution {p % 7}' for p in pairs],
+        'Computer': [f'Computer {p}' for p in pairs],
+        'feedback': '',
+        'Computations': 'VQE',
+        'Year': 2020,
+    })
+
+
+def legacy_layout(option: dict) -> dict:
+    """The same chart with one full source filtered per series in the browser."""
+    columns = option["dataset"][0]["dimensions"] if option["dataset"] else []
+    group = columns.index("Comp_Inst") if columns else 0
+    rows = [row for dataset in option["dataset"] for row in dataset["source"]]
+    names = [series["name"] for series in option["series"]]
+    return {
+        **option,
+        "dataset": [{"source": [columns] + rows}] + [
+            {"transform": {"type": "filter", "config": {"dimension": group, "eq": name}}}
+            for name in names
+        ],
+        "series": [{**series, "datasetIndex": idx + 1} for idx, series in enumerate(option["series"])],
+    }
+
+
+def build(frame: pd.DataFrame, budget: int, repeat: int) -> tuple[float, dict]:
+    """Best build time (s) of the partitioned option with CHART_POINT_BUDGET `budget`, and the option."""
+    chart_options.POINT_BUDGET = budget
+    institutions = frame['Institution'].unique().tolist()
+    computers = frame['Computer'].unique().tolist()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        option = build_scatter_option(frame, institutions, computers, [2020],
+                                      'Number of two-qubit gates', 'Number of qubits', 'Linear', 'Linear')
+        best = min(best, time.perf_counter() - start)
+    return best, option
+
+
+def check_empty_selection() -> None:
+    """Regression check: filters matching no rows (or no institution selected) give an empty chart."""
+    frame = synthetic_dataset(300, 5)
+    institutions = frame['Institution'].unique().tolist()
+    computers = frame['Computer'].unique().tolist()
+    for selection in ((institutions, computers, [1999]), ([], computers, [2020])):
+        option = build_scatter_option(frame, *selection, 'Number of two-qubit gates', 'Number of qubits',
+                                      'Linear', 'Linear')
+        points = sum(len(dataset["source"]) for dataset in option["dataset"])
+        if points or option["legend"]["data"]:
+            sys.exit(f"Empty selection {selection[0]!r}/{selection[2]!r} produced {points} points")
+
+
+def open_page(echarts: str):
+    """Starts headless Chromium on a blank page with ECharts loaded, or returns None without playwright."""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        print("playwright is not installed: reporting build time and payload size only\n")
+        return None
+    playwright = sync_playwright().start()
+    browser = playwright.chromium.launch()
+    page = browser.new_page(viewport={'width': 1200, 'height': 600})
+    page.set_content('<div id="chart" style="width:1200px;height:500px"></div>')
+    if os.path.exists(echarts):
+        page.add_script_tag(path=echarts)
+    else:
+        page.add_script_tag(url=echarts)
+    return playwright, browser, page
+
+
+def render(page, option: dict, repeat: int) -> float:
+    """Best render time (ms) of `option` in the page."""
+    option = json.loads(json.dumps(option, default=str))
+    return min(page.evaluate(RENDER_JS, option) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--computers', type=int, nargs='+', default=[5, 20, 50])
+    parser.add_argument('--budgets', type=int, nargs='+', default=[0, chart_options.POINT_BUDGET],
+                        help='point budgets to build with; 0 sends every point')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--echarts', default=ECHARTS_URL, help='URL or local path of echarts.min.js')
+    args = parser.parse_args()
+
+    check_empty_selection()
+    session = open_page(args.echarts)
+    header = (f"{'rows':>7} {'computers':>9} {'budget':>6} {'points':>7} | {'build ms':>8} | "
+              f"{'legacy kB':>9} {'partitioned kB':>14}")
+    if session:
+        header += f" | {'legacy render ms':>16} {'partitioned render ms':>21}"
+    print(header)
+    try:
+        for rows in args.rows:
+            for computers in args.computers:
+                frame = synthetic_dataset(rows, computers)
+                for budget in args.budgets:
+                    build_t, option = build(frame, budget, args.repeat)
+                    legacy = legacy_layout(option)
+                    points = sum(len(dataset["source"]) for dataset in option["dataset"])
+                    line = (f"{rows:>7} {computers:>9} {budget or 'all':>6} {points:>7} | {build_t * 1000:>8.1f} | "
+                            f"{payload_size(legacy) / 1024:>9.1f} {payload_size(option) / 1024:>14.1f}")
+                    if session:
+                        page = session[2]
+                        line += (f" | {render(page, legacy, args.repeat):>16.1f}"
+                                 f" {render(page, option, args.repeat):>21.1f}")
+                    print(line)
+    finally:
+        if session:
+            playwright, browser, _ = session
+            browser.close()
+            playwright.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark of approving update requests under concurrent moderators.
+
+Compares the previous two-commit sequence (DELETE the approved row, commit,
+UPDATE the request, commit) with the single-statement swap of
+moderation.approve_submissions. For each number of moderators a scratch copy
+of quant_data is seeded with approved rows and one update request per
+reference for a subset of them; the moderators then approve disjoint shares
+of the requests one at a time while a reader keeps counting the approved rows
+of those references.
+
+Reports per-approval latency, throughput, how often the reader saw a
+datapoint missing, and checks that every reference ends with exactly one
+approved row.
+
+Needs the database from the environment (DB_NAME, DB_USER, DB_PASSWORD). All
+work happens in a temporary schema that is dropped afterwards; quant_data
+itself is only used as the template of the scratch table.
+
+Usage:
+    python benchmarks/bench_moderation.py [--rows 100000] [--requests 2000] [--moderators 1 4 16] [--no-index]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The scratch schema has no approved_view: time the approval statement alone, not a
+# REFRESH that fails on every call (.env does not override this)
+os.environ["DB_APPROVED_VIEW"] = "0"
+from db import connect  # noqa: E402
+from moderation import approve_submissions  # noqa: E402
+
+SCHEMA = "bench_moderation"
+
+SEED_QUERY = """
+INSERT INTO quant_data (
+    id, reference, date, computation, num_qubits, num_2q_gates, num_1q_gates, total_gates,
+    circuit_depth, circuit_depth_measure, institution, computer, status, feedback
+)
+SELECT id, 'https://example.org/ref/' || ref, DATE '2015-01-01' + (ref %% 3650), '["VQE"]',
+       1 + ref %% 1000, ref %% 100000, ref %% 100000, ref %% 200000, ref %% 10000, 'two-qubit layers',
+       'Institution ' || (ref %% 7), 'Computer ' || (ref %% 40), status, ''
+FROM (
+    SELECT g AS id, g AS ref, 'APPROVED' AS status FROM generate_series(1, %(rows)s) g
+    UNION ALL
+    SELECT %(rows)s + g, g, 'UPDATE REQUESTED' FROM generate_series(1, %(requests)s) g
+) seed;
+"""
+
+
+def scratch_connection():
+    """Connection whose unqualified quant_data is the scratch table."""
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute(f"SET search_path = {SCHEMA}")
+    conn.commit()
+    return conn
+
+
+def seed(rows: int, requests: int, index: bool) -> None:
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCHEMA}")
+        cur.execute(f"CREATE TABLE {SCHEMA}.quant_data (LIKE public.quant_data INCLUDING DEFAULTS)")
+        cur.execute(f"ALTER TABLE {SCHEMA}.quant_data ADD PRIMARY KEY (id)")
+        cur.execute(f"SET search_path = {SCHEMA}")
+        cur.execute(SEED_QUERY, {'rows': rows, 'requests': requests})
+        if index:
+            cur.execute("CREATE INDEX ON quant_data (reference, status)")
+        cur.execute("ANALYZE quant_data")
+    conn.commit()
+    conn.close()
+
+
+def legacy_approve(conn, request_id: int, reference: str) -> None:
+    """The approval of an update request as it was done before."""
+    cur = conn.cursor()
+    cur.execute("DELETE from quant_data WHERE reference= %s and status= 'APPROVED'", (reference,))
+    conn.commit()
+    cur.execute("UPDATE quant_data SET status = 'APPROVED' WHERE id = %s", (request_id,))
+    conn.commit()
+    cur.close()
+
+
+def atomic_approve(conn, request_id: int, reference: str) -> None:
+    approve_submissions(conn, [request_id])
+
+
+def run(approve, rows: int, requests: int, moderators: int) -> dict:
+    """Approves every request with `moderators` threads; returns latency stats and reader observations."""
+    references = [f'https://example.org/ref/{g}' for g in range(1, requests + 1)]
+    work = [(rows + g, references[g - 1]) for g in range(1, requests + 1)]
+    latencies = [[] for _ in range(moderators)]
+    stop = threading.Event()
+    missing = {'reads': 0, 'short': 0}
+
+    def moderator(index: int) -> None:
+        conn = scratch_connection()
+        for request_id, reference in work[index::moderators]:
+            start = time.perf_counter()
+            approve(conn, request_id, reference)
+            latencies[index].append(time.perf_counter() - start)
+        conn.close()
+
+    def reader() -> None:
+        conn = scratch_connection()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            while not stop.is_set():
+                cur.execute("SELECT count(*) FROM quant_data WHERE reference = ANY(%s) AND status = 'APPROVED'",
+                            (references,))
+                missing['reads'] += 1
+                if cur.fetchone()[0] < requests:
+                    missing['short'] += 1
+        conn.close()
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    threads = [threading.Thread(target=moderator, args=(i,)) for i in range(moderators)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    reader_thread.join()
+
+    conn = scratch_connection()
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT count(*) FROM (
+                SELECT reference FROM quant_data WHERE reference = ANY(%s) AND status = 'APPROVED'
+                GROUP BY reference HAVING count(*) = 1
+            ) ok
+        """, (references,))
+        consistent = cur.fetchone()[0] == requests
+    conn.close()
+
+    ms = np.array([x for per_thread in latencies for x in per_thread]) * 1000
+    return {
+        'p50': np.percentile(ms, 50), 'p95': np.percentile(ms, 95), 'max': ms.max(),
+        'per_s': requests / elapsed, 'missing': f"{missing['short']}/{missing['reads']}",
+        'consistent': consistent,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--requests', type=int, default=2_000)
+    parser.add_argument('--moderators', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--no-index', action='store_true', help='skip the (reference, status) index')
+    args = parser.parse_args()
+
+    print(f"{'mode':>7} {'moderators':>10} | {'p50 ms':>7} {'p95 ms':>7} {'max ms':>7} | {'approvals/s':>11} | "
+          f"{'reads missing a row':>19} | consistent")
+    try:
+        for moderators in args.moderators:
+            for name, approve in (('legacy', legacy_approve), ('atomic', atomic_approve)):
+                seed(args.rows, args.requests, not args.no_index)
+                r = run(approve, args.rows, args.requests, moderators)
+                print(f"{name:>7} {moderators:>10} | {r['p50']:>7.2f} {r['p95']:>7.2f} {r['max']:>7.2f} | "
+                      f"{r['per_s']:>11.0f} | {r['missing']:>19} | {r['consistent']}")
+    finally:
+        conn = connect()
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark of transform_db_data against the previous row-wise implementation.
+
+Builds synthetic quant_data frames from 1k to 1M rows and reports wall time
+and peak traced memory of both implementations, after checking that they
+produce the same dataset.
+
+Usage:
+    python benchmarks/bench_transform.py [--sizes 1000 10000 100000 1000000] [--repeat 3]
+"""
+import os
+import sys
+import time
+import argparse
+import datetime as dt
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_ingestion import transform_db_data  # noqa: E402
+
+
+def legacy_transform_db_data(df: pd.DataFrame) -> pd.DataFrame:
+    """transform_db_data as it was before vectorization."""
+    df = df.drop(columns=['updated_at'], errors='ignore')
+    df['Computations'] = df['computation'].apply(
+        lambda x: ', '.join(x) if isinstance(x, list) else ''
+    )
+    df['Year'] = pd.to_datetime(df['date'], errors='coerce').dt.year
+    df['institution'] = df['institution'].astype(str).str.strip()
+    df['institution'] = df['institution'].replace('', np.nan).fillna('Unnamed')
+    df['computer'] = df['computer'].astype(str).str.strip()
+    df['computer'] = df['computer'].replace('', np.nan).fillna('Unnamed')
+    df['institution'] = df['institution'].astype(str).str.strip()
+    df['institution'] = df['institution'].replace('', np.nan).fillna('Unnamed')
+    df = df.rename(columns={
+        'reference': 'Reference', 'date': 'Date', 'computation': 'Computation',
+        'num_qubits': 'Number of qubits', 'num_2q_gates': 'Number of two-qubit gates',
+        'num_1q_gates': 'Number of single-qubit gates', 'total_gates': 'Total number of gates',
+        'circuit_depth': 'Circuit depth', 'circuit_depth_measure': 'Circuit depth measure',
+        'institution': 'Institution', 'computer': 'Computer',
+    })
+    return df
+
+
+def synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Rows shaped like load_data_from_db output, with blanks and empty lists mixed in."""
+    rng = np.random.default_rng(seed)
+    computations = np.array(['Trotter', 'VQE', 'QFT', 'Phase estimation', 'Sampling'], dtype=object)
+    institutions = np.array(['Google', ' IBM ', 'Quantinuum', 'QuEra', ''], dtype=object)
+    computers = np.array(['Sycamore', 'Eagle', 'H2', 'Aquila', ' '], dtype=object)
+    epoch = dt.date(2015, 1, 1)
+    days = rng.integers(0, 3650, rows)
+    sizes = rng.integers(0, 4, rows)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'reference': [f'https://arxiv.org/abs/{i}' for i in range(rows)],
+        'date': [epoch + dt.timedelta(days=int(d)) for d in days],
+        'computation': [list(rng.choice(computations, n, replace=False)) for n in sizes],
+        'num_qubits': rng.integers(1, 1000, rows),
+        'num_2q_gates': rng.integers(1, 10**6, rows).astype(float),
+        'num_1q_gates': rng.integers(1, 10**6, rows).astype(float),
+        'total_gates': rng.integers(1, 10**6, rows).astype(float),
+        'circuit_depth': rng.integers(1, 10**4, rows).astype(float),
+        'circuit_depth_measure': 'two-qubit layers',
+        'institution': institutions[rng.integers(0, len(institutions), rows)],
+        'computer': computers[rng.integers(0, len(computers), rows)],
+        'feedback': '',
+    })
+
+
+def measure(transform, frame: pd.DataFrame, repeat: int) -> tuple[float, float, pd.DataFrame]:
+    """Best wall time (s) and peak traced memory (MiB) of `transform` on copies of `frame`."""
+    best = float('inf')
+    for _ in range(repeat):
+        df = frame.copy()
+        start = time.perf_counter()
+        result = transform(df)
+        best = min(best, time.perf_counter() - start)
+
+    df = frame.copy()
+    tracemalloc.start()
+    result = transform(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 2**20, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} | {'legacy ms':>10} {'MiB':>8} | {'vectorized ms':>13} {'MiB':>8} | {'speedup':>7}")
+    for rows in args.sizes:
+        frame = synthetic_frame(rows)
+        old_t, old_mem, old = measure(legacy_transform_db_data, frame, args.repeat)
+        new_t, new_mem, new = measure(transform_db_data, frame, args.repeat)
+        pd.testing.assert_frame_equal(old, new, check_dtype=False)
+        print(f"{rows:>9} | {old_t * 1000:>10.1f} {old_mem:>8.1f} | {new_t * 1000:>13.1f} {new_mem:>8.1f} | {old_t / new_t:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
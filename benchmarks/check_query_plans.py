@@ -0,0 +1,181 @@
+"""
+Checks that the hot queries of the app are served by indexes.
+
+Creates a scratch schema with empty copies of quant_data and admin_users,
+applies every migration of migrations/ to it, seeds a large synthetic table
+(mostly approved rows, a small moderation backlog) and runs EXPLAIN on each
+hot query, including the admin table sorted on each column and searched.
+Exits with status 1 if any of them plans a sequential scan.
+
+The full load of the approved dataset and the admin-table count of one
+status are not checked: they read most of the table, for which a sequential
+scan is the right plan.
+
+Needs the database from the environment (DB_NAME, DB_USER, DB_PASSWORD). The
+scratch schema is dropped afterwards.
+
+Usage:
+    python benchmarks/check_query_plans.py [--rows 200000]
+"""
+import os
+import sys
+import argparse
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db import connect  # noqa: E402
+from migrate import migration_files  # noqa: E402
+from data_ingestion import (  # noqa: E402
+    DATASET_COLUMNS, FILTER_EXPRESSIONS, PENDING_STATUSES, TABLE_SORT_EXPRESSIONS,
+    table_page_query, table_count_query,
+)
+
+SCHEMA = "check_query_plans"
+
+SEED_QUERY = """
+INSERT INTO quant_data (
+    id, reference, date, computation, num_qubits, num_2q_gates, num_1q_gates, total_gates,
+    circuit_depth, circuit_depth_measure, institution, computer, status, feedback
+)
+SELECT g, 'https://example.org/ref/' || g, DATE '2015-01-01' + (g %% 3650), '["VQE"]',
+       1 + g %% 1000, g %% 100000, g %% 100000, g %% 200000, g %% 10000, 'two-qubit layers',
+       'Institution ' || (g %% 30), 'Computer ' || (g %% 300),
+       CASE WHEN g %% 100 < 95 THEN 'APPROVED' WHEN g %% 100 < 98 THEN 'PENDING' ELSE 'UPDATE REQUESTED' END,
+       ''
+FROM generate_series(1, %(rows)s) g;
+"""
+
+# name -> (query, parameters); mirrors the queries of data_ingestion, moderation and app
+HOT_QUERIES = {
+    "moderation queue page": (
+        "SELECT * FROM quant_data WHERE status = ANY(%(statuses)s) ORDER BY id DESC LIMIT 25",
+        {'statuses': PENDING_STATUSES},
+    ),
+    "moderation queue count": (
+        "SELECT count(*) FROM quant_data WHERE status = ANY(%(statuses)s)",
+        {'statuses': PENDING_STATUSES},
+    ),
+    "update request swap": (
+        "SELECT id FROM quant_data WHERE reference = %(reference)s AND status = 'APPROVED'",
+        {'reference': 'https://example.org/ref/1234'},
+    ),
+    "record by id": (
+        f"SELECT {', '.join(DATASET_COLUMNS)} FROM quant_data WHERE id = %(id)s AND status = 'APPROVED'",
+        {'id': 1234},
+    ),
+    "visualization filters": (
+        f"SELECT {', '.join(DATASET_COLUMNS)} FROM quant_data WHERE status = 'APPROVED'"
+        f" AND {FILTER_EXPRESSIONS['Institution']} = ANY(%(institutions)s)"
+        f" AND {FILTER_EXPRESSIONS['Computer']} = ANY(%(computers)s)"
+        f" AND {FILTER_EXPRESSIONS['Year']} = ANY(%(years)s)",
+        {'institutions': ['Institution 3'], 'computers': ['Computer 33'], 'years': [2020]},
+    ),
+    "incremental sync": (
+        f"SELECT {', '.join(DATASET_COLUMNS)}, status FROM quant_data WHERE change_xid >= %(since)s::text::xid8",
+        {'since': None},  # the seeding transaction's id, filled in by setup()
+    ),
+    "admin login": (
+        "SELECT * FROM admin_users WHERE username = %(username)s AND password = %(password)s",
+        {'username': 'admin1234', 'password': 'secret'},
+    ),
+    "admin table search page": table_page_query('id', True, search='Computer 123'),
+    "admin table search count": table_count_query(search='Computer 123'),
+}
+
+# A sort key from the middle of the seeded data per admin-table sort column
+TABLE_KEYSET_SAMPLES = {
+    'id': 1000, 'reference': 'https://example.org/ref/5', 'date': date(2020, 1, 1),
+    'num_qubits': 500, 'num_2q_gates': 50_000, 'total_gates': 100_000, 'circuit_depth': 5_000,
+    'institution': 'Institution 15', 'computer': 'Computer 150', 'status': 'PENDING',
+}
+
+# The admin table sorted on every column: the first page, and a later page in the other direction
+for column in TABLE_SORT_EXPRESSIONS:
+    HOT_QUERIES[f"admin table by {column}"] = table_page_query(column, True)
+    HOT_QUERIES[f"admin table by {column}, next page"] = table_page_query(
+        column, False, after=(TABLE_KEYSET_SAMPLES[column], 1000))
+
+
+def setup(conn, rows: int) -> None:
+    """Builds the scratch schema, applies the migrations and seeds it."""
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCHEMA}")
+        cur.execute(f"CREATE TABLE {SCHEMA}.quant_data (LIKE public.quant_data INCLUDING DEFAULTS)")
+        cur.execute(f"ALTER TABLE {SCHEMA}.quant_data ADD PRIMARY KEY (id)")
+        cur.execute(f"CREATE TABLE {SCHEMA}.admin_users (LIKE public.admin_users INCLUDING DEFAULTS)")
+        # public stays visible for extensions (pg_trgm) already installed there
+        cur.execute(f"SET search_path = {SCHEMA}, public")
+        for _, path in migration_files():
+            with open(path) as f:
+                cur.execute(f.read())
+
+        # Seed without the change-tracking triggers (change_xid stays 0), then
+        # mark a few rows as changed by this transaction
+        cur.execute("ALTER TABLE quant_data DISABLE TRIGGER USER")
+        cur.execute(SEED_QUERY, {'rows': rows})
+        cur.execute("UPDATE quant_data SET change_xid = pg_current_xact_id() WHERE id % 10000 = 0")
+        cur.execute("SELECT pg_current_xact_id()::text::bigint")
+        HOT_QUERIES["incremental sync"][1]['since'] = cur.fetchone()[0]
+        cur.execute("ALTER TABLE quant_data ENABLE TRIGGER USER")
+        cur.execute("""
+            INSERT INTO admin_users (username, password)
+            SELECT 'admin' || g, 'secret' FROM generate_series(1, %(rows)s) g
+        """, {'rows': rows // 10})
+    conn.commit()
+
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("VACUUM ANALYZE quant_data")
+        cur.execute("VACUUM ANALYZE admin_users")
+    conn.autocommit = False
+
+
+def _scans(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _scans(child)
+
+
+def explain(conn, query: str, params: dict) -> list[str]:
+    """Returns the scan nodes of the plan, e.g. 'Index Scan on quant_data using quant_data_pkey'."""
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        plan = cur.fetchone()[0][0]["Plan"]
+    nodes = []
+    for node in _scans(plan):
+        if "Relation Name" in node:
+            index = f" using {node['Index Name']}" if "Index Name" in node else ""
+            nodes.append(f"{node['Node Type']} on {node['Relation Name']}{index}")
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    conn = connect()
+    failures = 0
+    try:
+        setup(conn, args.rows)
+        for name, (query, params) in HOT_QUERIES.items():
+            nodes = explain(conn, query, params)
+            ok = not any(node.startswith("Seq Scan") for node in nodes)
+            failures += not ok
+            print(f"{'ok' if ok else 'FAIL':>4}  {name}: {'; '.join(nodes)}")
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        conn.close()
+
+    if failures:
+        print(f"{failures} hot quer{'y' if failures == 1 else 'ies'} fell back to a sequential scan")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
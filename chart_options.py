@@ -0,0 +1,324 @@
+# Import necessary libraries
+import os
+import json
+import math
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import startup
+from marker_size import marker_sizes
+
+# Setting up logger object for console logging
+logger = logging.getLogger("chart_options")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+TOOLTIP_COLUMNS = [
+    'Reference', 'Date', 'Number of qubits', 'Number of two-qubit gates',
+    'Number of single-qubit gates', 'Total number of gates', 'Circuit depth',
+    'Circuit depth measure', 'Institution', 'Computer', 'Computations'
+]
+
+# Decimals kept for non-integral numbers in the chart payload
+PAYLOAD_DECIMALS = 3
+
+# Points above which the scatter is downsampled and drawn in ECharts' large
+# mode; 0 sends every point
+POINT_BUDGET = int(os.getenv("CHART_POINT_BUDGET", "5000"))
+# Points ECharts draws per animation frame in progressive rendering
+PROGRESSIVE_CHUNK = 2000
+
+# one-line JS required; shows log axis labels as powers of 10
+LOG_AXIS_FORMATTER = "function (val) { var e = Math.log10(val); var map = {'0':'⁰','1':'¹','2':'²','3':'³','4':'⁴','5':'⁵','6':'⁶','7':'⁷','8':'⁸','9':'⁹','-':'⁻'}; return '10' + e.toString().split('').map(function(c){return map[c]||c}).join(''); }"
+
+
+class OptionCache:
+    """
+    Thread-safe LRU cache of chart options bounded by their serialized size.
+
+    Args:
+        max_bytes (int): Total size of the cached options, as JSON, above which
+            the least recently used ones are evicted.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (option, size in bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return self._entries[key][0]
+
+    def put(self, key, option: dict, size: int) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (option, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns hits, misses, evictions, number of entries and their total size.
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache = OptionCache(int(os.getenv("CHART_CACHE_BYTES", str(32 * 1024 * 1024))))
+
+
+def _axis(scale: str, name: str, name_gap: int) -> dict:
+    return {
+        "type": "log" if scale == "Log" else "value",
+        "splitLine": {"lineStyle": {"type": "dashed"}},
+        "min": 1,
+        "name": name,
+        "nameLocation": "middle",
+        "nameGap": name_gap,
+        "axisLabel": {
+            # JsCode makes streamlit_echarts send the formatter as a JS function
+            "formatter": startup.lazy_import("pyecharts.commons.utils").JsCode(LOG_AXIS_FORMATTER).js_code
+            if scale == "Log" else "{value}"
+        },
+    }
+
+# Column of the normalized marker sizes (see marker_size)
+SIZE_COLUMN = 'Marker size'
+
+def payload_columns(y_axis: str, b_axis: str) -> list[str]:
+    """
+    Columns sent to the browser, without duplicates. id and Reference come
+    first: the click handlers read them as params.value[0] and params.value[1].
+    """
+    columns = ['id', 'Reference', 'Number of qubits', y_axis, b_axis, 'Comp_Inst'] + TOOLTIP_COLUMNS
+    return list(dict.fromkeys(columns))
+
+def build_payload(graph_df: pd.DataFrame, columns: list[str], group_by: str) -> tuple[list, list[dict]]:
+    """
+    Builds one dataset per value of `group_by`, holding `columns` only.
+
+    The rows are partitioned here with a single groupby, so each series reads
+    its own dataset instead of the browser filtering the full source once per
+    series. Numeric columns holding whole numbers are sent as integers, the
+    others rounded to PAYLOAD_DECIMALS, which keeps the serialized JSON short.
+
+    Returns:
+        tuple: The group values, in order of first appearance, and their datasets.
+    """
+    payload = graph_df[columns].copy()
+    for col in payload.select_dtypes(include='number').columns:
+        values = payload[col]
+        if (values % 1 == 0).all():
+            payload[col] = values.astype('int64')
+        else:
+            payload[col] = values.round(PAYLOAD_DECIMALS)
+
+    rows = payload.values.tolist()
+    groups = payload.groupby(group_by, sort=False).indices
+    datasets = [
+        {"dimensions": columns, "source": [rows[i] for i in positions]}
+        for positions in groups.values()
+    ]
+    return list(groups), datasets
+
+def payload_size(option: dict) -> int:
+    """
+    Size in bytes of the option serialized as compact JSON.
+    """
+    return len(json.dumps(option, separators=(',', ':'), default=str).encode())
+
+def _grid_cells(values: pd.Series, cells: int, log: bool) -> np.ndarray:
+    values = values.to_numpy(dtype=float)
+    if log:
+        # Log axes start at 1, as the chart does
+        values = np.log10(np.clip(values, 1, None))
+    low, high = np.nanmin(values), np.nanmax(values)
+    if not high > low:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * cells).astype(np.int64), cells - 1)
+
+def downsample(graph_df: pd.DataFrame, x: str, y: str, size: str, group: str,
+               budget: int, x_log: bool = False, y_log: bool = False) -> pd.DataFrame:
+    """
+    Thins a scatter to roughly `budget` points on a grid over the plot area.
+
+    The plot is split into about `budget` cells (in log space on log axes) and
+    each occupied cell keeps its point with the largest marker. The points
+    holding the smallest and largest x and y of every group are always kept,
+    so records and outliers stay visible. Kept rows are real rows, so hovering
+    and clicking still resolve to their id and Reference.
+
+    Returns:
+        pd.DataFrame: The kept rows, in their original order.
+    """
+    if budget <= 0 or len(graph_df) <= budget:
+        return graph_df
+    cells = max(1, math.isqrt(budget))
+    frame = pd.DataFrame({
+        "gx": _grid_cells(graph_df[x], cells, x_log),
+        "gy": _grid_cells(graph_df[y], cells, y_log),
+        "size": graph_df[size].to_numpy(),
+    }, index=graph_df.index)
+    representatives = frame.sort_values("size", ascending=False, kind="stable") \
+        .drop_duplicates(["gx", "gy"]).index
+
+    grouped = graph_df.groupby(group, sort=False)
+    extremes = pd.concat([grouped[x].idxmin(), grouped[x].idxmax(),
+                          grouped[y].idxmin(), grouped[y].idxmax()])
+    keep = graph_df.index.isin(representatives) | graph_df.index.isin(extremes)
+    return graph_df[keep]
+
+def build_scatter_option(df: pd.DataFrame, institutions: list, computers: list, years: list,
+                         y_axis: str, b_axis: str, x_axis_scale: str, y_axis_scale: str,
+                         b_axis_scale: str = "Linear") -> dict:
+    """
+    Builds the ECharts option of the Visualization scatter plot.
+
+    Args:
+        df (pd.DataFrame): The transformed dataset.
+        institutions, computers, years (list): Selected filter values.
+        y_axis (str): Column on the vertical axis.
+        b_axis (str): Column setting the marker size ('Date': more recent = larger).
+        x_axis_scale, y_axis_scale (str): 'Linear' or 'Log'.
+        b_axis_scale (str): Marker scaling, one of marker_size.SCALES.
+
+    Returns:
+        dict: The option passed to st_echarts.
+    """
+    sizes = marker_sizes(df, b_axis, b_axis_scale)
+    selected = (
+        (df['Institution'].isin(institutions)) &
+        (df['Computer'].isin(computers)) &
+        (df['Year'].isin(years)) &
+        sizes.notna()
+    )
+    graph_df = df[selected].copy()
+    # Positional: assigning a Series to an empty frame would adopt its whole index
+    graph_df[SIZE_COLUMN] = sizes[selected].to_numpy()
+
+    graph_df["Date"] = graph_df["Date"].astype(str)
+    graph_df_numeric = graph_df.select_dtypes(include='number')
+    graph_df[graph_df_numeric.columns] = graph_df_numeric.fillna(0)
+
+    graph_df_category = graph_df.select_dtypes(exclude='number')
+    graph_df[graph_df_category.columns] = graph_df_category.fillna('')
+
+    graph_df["Comp_Inst"] = graph_df["Institution"] + " " + graph_df["Computer"]
+
+    # Indices into the pruned payload, resolved by name
+    columns = payload_columns(y_axis, SIZE_COLUMN)
+    x_index = columns.index("Number of qubits")
+    y_index = columns.index(y_axis)
+    tooltip_index = [columns.index(c) for c in TOOLTIP_COLUMNS]
+    bubble_index = columns.index(SIZE_COLUMN)
+
+    total = len(graph_df)
+    graph_df = downsample(graph_df, "Number of qubits", y_axis, SIZE_COLUMN, "Comp_Inst", POINT_BUDGET,
+                          x_axis_scale == "Log", y_axis_scale == "Log")
+    large = len(graph_df) < total
+    comp_inst, datasets = build_payload(graph_df, columns, "Comp_Inst")
+
+    title = {"left": "center"}
+    if large:
+        title["subtext"] = f"Showing {len(graph_df):,} of {total:,} points"
+        logger.debug('Downsampled chart from %s to %s points', total, len(graph_df))
+    # Large mode only kicks in for series still above the budget after downsampling
+    large_mode = {"large": True, "largeThreshold": POINT_BUDGET, "progressive": PROGRESSIVE_CHUNK} if large else {}
+
+    return {
+        "dataset": datasets,
+        "title": title,
+        "legend": {"data": comp_inst, "bottom": 1},
+        "tooltip": {"trigger": "item", "confine": True, "appendToBody": True},
+        "xAxis": _axis(x_axis_scale, "Number of qubits", 30),
+        "yAxis": _axis(y_axis_scale, y_axis, 50),
+        "visualMap": {
+            "show": False,
+            # Sizes are normalized over the whole dataset, so the range is fixed
+            "dimension": bubble_index,
+            "min": 0,
+            "max": 1,
+            "seriesIndex": list(range(len(comp_inst))),
+            "inRange": {"symbolSize": [50, 120]}
+        },
+        "series": [
+            {
+                "name": comp,
+                "type": "scatter",
+                "datasetIndex": idx,  # one pre-sliced dataset per series
+                "encode": {"x": x_index, "y": y_index, "tooltip": tooltip_index},
+                **large_mode,
+            }
+            for idx, comp in enumerate(comp_inst)
+        ]
+    }
+
+def get_scatter_option(df: pd.DataFrame, institutions: list, computers: list, years: list,
+                       y_axis: str, b_axis: str, x_axis_scale: str, y_axis_scale: str,
+                       b_axis_scale: str = "Linear") -> dict:
+    """
+    Memoized build_scatter_option.
+
+    Options are keyed on the dataset they were built from (the "dataset_key"
+    attribute set by dataset_cache), the normalized filters, the axes and the
+    axis scales, so repeated views skip the pandas work and the JSON building.
+    Frames without a dataset key are never cached. The returned option is
+    shared and must not be modified. The serialized size of every built
+    option is logged.
+    """
+    dataset_key = df.attrs.get("dataset_key")
+    key = None
+    if dataset_key is not None:
+        key = (
+            dataset_key,
+            tuple(sorted(map(str, institutions))),
+            tuple(sorted(map(str, computers))),
+            tuple(sorted(int(y) for y in years)),
+            y_axis, b_axis, x_axis_scale, y_axis_scale, b_axis_scale,
+        )
+        option = _cache.get(key)
+        if option is not None:
+            return option
+
+    option = build_scatter_option(df, institutions, computers, years,
+                                  y_axis, b_axis, x_axis_scale, y_axis_scale, b_axis_scale)
+    size = payload_size(option)
+    logger.debug('Built chart option: %s points, %s bytes',
+                 sum(len(d["source"]) for d in option["dataset"]), size)
+    if key is not None:
+        _cache.put(key, option, size)
+    return option
+
+def chart_cache_stats() -> dict:
+    """
+    Returns the statistics of the chart option cache.
+    """
+    return _cache.stats()
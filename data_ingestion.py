@@ -3,22 +3,18 @@ import pandas as pd
 import numpy as np
 import logging
 from collections import defaultdict
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import psycopg2
 from psycopg2.extensions import connection as PGConnection
+from psycopg2.extras import RealDictCursor
+from db import pooled_connection
+import startup
+from sheet_mirror import fetch_workbook, load_parsed, store_parsed
 
 load_dotenv()
 
-# Setting up Database connection
-conn = psycopg2.connect(
-    host="localhost",
-    database=os.getenv("DB_NAME"),
-    user=os.getenv("DB_USER"),
-    password=os.getenv("DB_PASSWORD"),
-    port="5432"
-)
-
 # Setting up logger object for console logging
 logger = logging.getLogger("data_ingestion")
 logger.setLevel(logging.DEBUG)
@@ -31,21 +27,159 @@ console_handler.setFormatter(formatter)
 
 logger.addHandler(console_handler)
 
+# Function to stream one worksheet into a DataFrame
+def _header_names(headers: list[tuple]) -> tuple[list[str], list[str]]:
+    """
+    Column names of a (possibly multi-row) header, the way pd.read_excel builds them.
+
+    In a multi-row header a blank cell continues the cell to its left (merged
+    cells) unless the row above starts a new value there; cells still blank
+    are named 'Unnamed: <i>' / 'Unnamed: <i>_level_<n>'. Only the last row is
+    returned, but columns whose whole header repeats an earlier one get a
+    '.1', '.2', ... suffix.
+
+    Returns:
+        tuple: The column names and the same names without the suffix.
+    """
+    width = max((len(h) for h in headers), default=0)
+    levels = [list(h) + [None] * (width - len(h)) for h in headers]
+    if len(levels) > 1:
+        fill = [True] * width
+        for level in levels:
+            last = level[0] if width else None
+            for i in range(1, width):
+                if not fill[i]:
+                    last = level[i]
+                if level[i] is None:
+                    level[i] = last
+                else:
+                    fill[i] = False
+                    last = level[i]
+
+    depth = len(levels) - 1
+    base = [
+        [str(name) if name is not None else f"Unnamed: {i}" + (f"_level_{n}" if depth else "")
+         for i, name in enumerate(level)]
+        for n, level in enumerate(levels)
+    ]
+    seen = defaultdict(int)
+    names = []
+    for key in zip(*base):
+        name = key[-1]
+        names.append(name if seen[key] == 0 else f"{name}.{seen[key]}")
+        seen[key] += 1
+    return names, (base[-1] if base else [])
+
+def read_sheet(raw: bytes, sheet: int, skip_rows: int = 0, header_rows: int = 1,
+               usecols: list[str] | None = None) -> pd.DataFrame:
+    """
+    Parses one worksheet of an xlsx workbook with openpyxl in read-only
+    (streaming) mode, keeping only the requested columns.
+
+    Column names come from the last header row and follow pd.read_excel (see
+    _header_names). As with pd.read_excel, empty rows between data rows are
+    kept as missing values and trailing empty rows are dropped.
+
+    Args:
+        raw (bytes): The workbook.
+        sheet (int): Worksheet index.
+        skip_rows (int): Rows above the header to ignore.
+        header_rows (int): Number of header rows.
+        usecols (list[str] | None): Column names to keep (all when None); a
+            repeated name keeps all its columns.
+
+    Returns:
+        pd.DataFrame: The worksheet, or an empty frame if the workbook has no such sheet.
+    """
+    # Deferred: only the sheet data source needs openpyxl
+    openpyxl = startup.lazy_import("openpyxl")
+    workbook = openpyxl.load_workbook(io.BytesIO(raw), read_only=True, data_only=True, keep_links=False)
+    try:
+        if sheet >= len(workbook.worksheets):
+            logger.warning('Workbook has no sheet %s', sheet)
+            return pd.DataFrame()
+        rows = workbook.worksheets[sheet].iter_rows(values_only=True)
+        for _ in range(skip_rows):
+            next(rows, None)
+        names, base = _header_names([next(rows, ()) for _ in range(header_rows)])
+        keep = [i for i in range(len(names)) if usecols is None or base[i] in usecols]
+
+        data = []
+        filled = 0
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in keep]
+            data.append(values)
+            if any(v is not None for v in values):
+                filled = len(data)
+        del data[filled:]
+    finally:
+        workbook.close()
+
+    return pd.DataFrame(data, columns=[names[i] for i in keep]).infer_objects()
+
+def sheet_columns() -> list[str] | None:
+    """
+    Columns of the data sheet to load: SHEET_COLUMNS as a comma-separated list
+    of second-level header names, or all columns when unset.
+    """
+    value = os.getenv("SHEET_COLUMNS", "").strip()
+    return [name.strip() for name in value.split(",") if name.strip()] or None
+
+def _parse_data_sheet(raw: bytes) -> pd.DataFrame:
+    # Two-level header; only the second level names the columns
+    return read_sheet(raw, sheet=0, header_rows=2, usecols=sheet_columns())
+
+def _parse_computers_sheet(raw: bytes) -> pd.DataFrame:
+    df = read_sheet(raw, sheet=1, skip_rows=1, header_rows=1)
+    return df.drop(columns=['Unnamed: 0'], errors='ignore')
+
+SHEET_PARSERS = {'data': _parse_data_sheet, 'computers': _parse_computers_sheet}
+
+# Bump when read_sheet or a parser changes its output so stored parsed frames are ignored
+SHEET_PARSER_VERSION = 2
+
+def _parse_options(name: str) -> str:
+    """
+    Identifies everything besides the workbook content that the parsed frame `name` depends on.
+    """
+    columns = sheet_columns() if name == 'data' else None
+    return f"v{SHEET_PARSER_VERSION};columns={','.join(columns) if columns else '*'}"
+
+# Function to load both sheets of the workbook
+def load_sheet_frames(sheet_id: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Downloads the workbook once and returns its data sheet and its computers sheet.
+
+    The export is mirrored locally (see sheet_mirror) and revalidated with a
+    conditional request. Sheets already parsed from the same content with the
+    same parser version and SHEET_COLUMNS are reused; the others are parsed
+    concurrently in a thread pool.
+
+    Returns:
+        tuple: The data sheet and the computers sheet.
+    """
+    raw, digest = fetch_workbook(sheet_id)
+    options = {name: _parse_options(name) for name in SHEET_PARSERS}
+    frames = {name: load_parsed(sheet_id, digest, name, options[name]) for name in SHEET_PARSERS}
+    missing = [name for name, df in frames.items() if df is None]
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            futures = {name: pool.submit(SHEET_PARSERS[name], raw) for name in missing}
+            for name, future in futures.items():
+                frames[name] = future.result()
+                store_parsed(sheet_id, digest, frames[name], name, options[name])
+        logger.debug('Parsed sheets %s', missing)
+    else:
+        logger.debug('Sheet unchanged, using parsed copies')
+    return frames['data'], frames['computers']
+
 # Function to load data from Excel sheet
 def load_data_from_sheet(sheet_id: str)->pd.DataFrame:
     """
     Loading data from google sheet url
     """
     try:
-        url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=xlsx"
-        df = pd.read_excel(url,header=[0,1]) # loading multilevel headers
-    
-        # Removing unnamed portion of headers
-        df.columns = [
-        second
-        for first, second in df.columns
-        ]
-        
+        df, _ = load_sheet_frames(sheet_id)
         logger.debug('Data Loaded successfully')
         return df
          
@@ -53,6 +187,19 @@ def load_data_from_sheet(sheet_id: str)->pd.DataFrame:
         logger.error('Unexpected Exception: % s',e)
         raise
 
+# Function to load the computers overview from Excel sheet
+def load_comp_data_from_sheet(sheet_id: str)->pd.DataFrame:
+    """
+    Loading the quantum computers sheet (second sheet) from google sheet url
+    """
+    try:
+        _, df_comp = load_sheet_frames(sheet_id)
+        return df_comp
+
+    except Exception as e:
+        logger.error('Unexpected Exception: % s',e)
+        raise
+
 # Function to handle duplicate column entries        
 def handle_duplicate_columns(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
     """
@@ -92,8 +239,39 @@ def handle_duplicate_columns(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]
         logger.error('Error while handling duplicate columns: %s', e)
         raise
 
+# Function to merge a group of duplicate columns
+def merge_columns(df: pd.DataFrame, columns: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merges several columns into one ', '-separated string per row, skipping
+    missing values. Equivalent to
+    `df[columns].apply(lambda row: ', '.join(row.dropna().astype(str)), axis=1)`
+    but done column by column over whole arrays.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+        columns (list[str]): Columns to merge, in order.
+
+    Returns:
+        tuple: A tuple containing:
+            - np.ndarray: Merged strings, one per row.
+            - np.ndarray: Boolean mask of the non-missing cells, shape (rows, len(columns)).
+    """
+    # to_numpy gives the same common dtype the row-wise apply used to see
+    values = df[columns].to_numpy()
+    present = ~pd.isna(values)
+    as_text = values.astype(str).astype(object)
+
+    merged = np.full(len(df), '', dtype=object)
+    filled = np.zeros(len(df), dtype=bool)
+    for j in range(len(columns)):
+        valid = present[:, j]
+        separator = np.where(filled & valid, ', ', '')
+        merged = np.where(valid, merged + separator + as_text[:, j], merged)
+        filled |= valid
+    return merged, present
+
 # Function for Feature Engineering
-def add_custom_columns(df: pd.DataFrame, repeated_columns: list[str]) -> pd.DataFrame:
+def add_custom_columns(df: pd.DataFrame, repeated_columns: list[str], as_lists: bool = False) -> pd.DataFrame:
     """
     Adds custom columns to the DataFrame by:
     - Extracting the year from a 'Date' column.
@@ -102,6 +280,9 @@ def add_custom_columns(df: pd.DataFrame, repeated_columns: list[str]) -> pd.Data
     Args:
         df (pd.DataFrame): The input DataFrame.
         repeated_columns (List[str]): A list of base names of duplicated columns.
+        as_lists (bool): Also store each combined column as lists of values in
+            '<combined column>_list', so filters need not re-split the strings
+            (see explode_combined_column).
 
     Returns:
         pd.DataFrame: The updated DataFrame with additional custom columns.
@@ -111,19 +292,28 @@ def add_custom_columns(df: pd.DataFrame, repeated_columns: list[str]) -> pd.Data
         df['Year'] = pd.to_datetime(df['Date'], errors='coerce').dt.year
         logger.debug("Year column created from 'Date'")
 
-        final_dict = {}
-
-        # Group duplicated columns by base name
-        for rcol in repeated_columns:
-            final_dict[rcol] = [col for col in df.columns if col == rcol or col.startswith(f"{rcol}_")]
+        # Group duplicated columns by base name in a single pass over the columns
+        final_dict = {rcol: [] for rcol in repeated_columns}
+        for col in df.columns:
+            for rcol in repeated_columns:
+                if col == rcol or col.startswith(f"{rcol}_"):
+                    final_dict[rcol].append(col)
 
         # Create combined columns
+        new_columns = {}
         for base_col, columns_to_combine in final_dict.items():
             new_col_name = f"{base_col}s" if not base_col.endswith('s') else f"{base_col}_combined"
-            df[new_col_name] = df[columns_to_combine].apply(
-                lambda row: ', '.join(row.dropna().astype(str)), axis=1
-            )
-            logger.debug("Created combined column ")
+            merged, present = merge_columns(df, columns_to_combine)
+            new_columns[new_col_name] = merged
+            if as_lists:
+                as_text = df[columns_to_combine].to_numpy().astype(str)
+                new_columns[f"{new_col_name}_list"] = [
+                    row[mask].tolist() for row, mask in zip(as_text, present)
+                ]
+            logger.debug("Created combined column %s", new_col_name)
+
+        for name, values in new_columns.items():
+            df[name] = values
 
         logger.debug("Custom columns added successfully.")
         return df
@@ -131,7 +321,17 @@ def add_custom_columns(df: pd.DataFrame, repeated_columns: list[str]) -> pd.Data
     except Exception as e:
         logger.error("Failed to add custom columns: %s", e)
         raise
-        pass
+
+# Function to expand a list column built by add_custom_columns(as_lists=True)
+def explode_combined_column(df: pd.DataFrame, list_column: str) -> pd.Series:
+    """
+    Returns one entry per (row, value) of a list column, indexed by the row
+    label. Rows having any of `values`:
+
+        exploded = explode_combined_column(df, 'Error mitigations_list')
+        df.loc[exploded[exploded.isin(values)].index.unique()]
+    """
+    return df[list_column].explode().dropna()
 
 # Function for missing columns imputation
 def rename_missing_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -169,23 +369,389 @@ def rename_missing_data(df: pd.DataFrame) -> pd.DataFrame:
         logger.error("Error while renaming/cleaning columns: %s", e)
         raise
 
-def load_data_from_db(conn: PGConnection)->pd.DataFrame:
-    query = "SELECT * FROM quant_data where status = 'APPROVED';"
-    df_comp = pd.read_sql_query(query, conn)
+# Columns of quant_data used by the chart, its tooltips and the update form
+DATASET_COLUMNS = [
+    'id', 'reference', 'date', 'computation',
+    'num_qubits', 'num_2q_gates', 'num_1q_gates', 'total_gates',
+    'circuit_depth', 'circuit_depth_measure',
+    'institution', 'computer', 'feedback',
+]
+NUMERIC_COLUMNS = ['id', 'num_qubits', 'num_2q_gates', 'num_1q_gates', 'total_gates', 'circuit_depth']
+
+# Rows fetched per round trip from the server-side cursor
+FETCH_CHUNK_SIZE = int(os.getenv("DB_FETCH_CHUNK", "5000"))
+
+def _rows_to_frame(rows: list[tuple], columns: list[str],
+                   numeric: list[str] = NUMERIC_COLUMNS) -> pd.DataFrame:
+    """
+    Converts one chunk of cursor rows into a DataFrame with numeric columns as typed arrays.
+    """
+    df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    for col in numeric:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+def _stream_rows(conn: PGConnection, query: str, columns: list[str], cursor_name: str,
+                 chunk_size: int, numeric: list[str] = NUMERIC_COLUMNS) -> tuple[pd.DataFrame, int]:
+    """
+    Runs `query` on a named (server-side) cursor and converts it `chunk_size`
+    rows at a time; returns the frame and the number of chunks.
+    """
+    chunks = []
+    with conn.cursor(name=cursor_name) as cur:
+        cur.itersize = chunk_size
+        cur.execute(query)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunks.append(_rows_to_frame(rows, columns, numeric))
+
+    if not chunks:
+        return _rows_to_frame([], columns, numeric), 0
+    return (pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]), len(chunks)
+
+def load_data_from_db(conn: PGConnection, chunk_size: int = FETCH_CHUNK_SIZE)->pd.DataFrame:
+    """
+    Loads the approved datapoints, selecting only DATASET_COLUMNS.
+
+    Rows are streamed through a named (server-side) cursor `chunk_size` rows at
+    a time and each chunk is converted to typed columns before the next one is
+    fetched, so the raw result set is never held client-side all at once.
+
+    Args:
+        conn (PGConnection): Open database connection.
+        chunk_size (int): Rows per fetch.
+
+    Returns:
+        pd.DataFrame: The approved rows of quant_data.
+    """
+    query = f"SELECT {', '.join(DATASET_COLUMNS)} FROM quant_data where status = 'APPROVED';"
+    df_comp, chunks = _stream_rows(conn, query, DATASET_COLUMNS, "load_approved_quant_data", chunk_size)
+    logger.debug('Loaded %s approved rows in %s chunk(s)', len(df_comp), chunks)
     return df_comp
 
-def load_comp_data_from_db()->pd.DataFrame:
-    conn = psycopg2.connect(
-                host="localhost",
-                database=os.getenv("DB_NAME"),
-                user=os.getenv("DB_USER"),
-                password=os.getenv("DB_PASSWORD"),
-                port="5432"
+# SQL expressions matching the Institution / Computer / Year columns built by
+# transform_db_data (strip_whitespace trims like str.strip); migrations/009
+# indexes them for the approved rows.
+FILTER_EXPRESSIONS = {
+    'Institution': "COALESCE(NULLIF(strip_whitespace(institution), ''), 'Unnamed')",
+    'Computer': "COALESCE(NULLIF(strip_whitespace(computer), ''), 'Unnamed')",
+    'Year': "(EXTRACT(YEAR FROM date))::int",
+}
+
+def load_filter_options_from_db(conn: PGConnection) -> pd.DataFrame:
+    """
+    Loads the distinct Institution / Computer / Year combinations of the approved
+    rows, which is all the Visualization filters need to build their choices.
+    """
+    query = (
+        "SELECT DISTINCT "
+        + ", ".join(f'{expr} AS "{name}"' for name, expr in FILTER_EXPRESSIONS.items())
+        + " FROM quant_data WHERE status = 'APPROVED';"
+    )
+    return pd.read_sql_query(query, conn)
+
+def load_filtered_data_from_db(conn: PGConnection, institutions: list[str],
+                               computers: list[str], years: list[int]) -> pd.DataFrame:
+    """
+    Loads the approved rows matching the Visualization filters, with the
+    filters applied in SQL.
+
+    Args:
+        conn (PGConnection): Open database connection.
+        institutions (list[str]): Selected institutions.
+        computers (list[str]): Selected computers.
+        years (list[int]): Selected years.
+
+    Returns:
+        pd.DataFrame: Matching rows of quant_data (untransformed).
+    """
+    query = (
+        f"SELECT {', '.join(DATASET_COLUMNS)} FROM quant_data"
+        " WHERE status = 'APPROVED'"
+        f" AND {FILTER_EXPRESSIONS['Institution']} = ANY(%(institutions)s)"
+        f" AND {FILTER_EXPRESSIONS['Computer']} = ANY(%(computers)s)"
+        f" AND {FILTER_EXPRESSIONS['Year']} = ANY(%(years)s);"
+    )
+    params = {
+        'institutions': list(institutions),
+        'computers': list(computers),
+        'years': [int(y) for y in years],
+    }
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        return _rows_to_frame(cur.fetchall(), DATASET_COLUMNS)
+
+def load_record_from_db(conn: PGConnection, record_id: int) -> pd.DataFrame:
+    """
+    Loads a single approved row by id (primary-key lookup).
+
+    Args:
+        conn (PGConnection): Open database connection.
+        record_id (int): quant_data id.
+
+    Returns:
+        pd.DataFrame: The row of quant_data (untransformed), or an empty frame.
+    """
+    query = (
+        f"SELECT {', '.join(DATASET_COLUMNS)} FROM quant_data"
+        " WHERE id = %s AND status = 'APPROVED';"
+    )
+    with conn.cursor() as cur:
+        cur.execute(query, (int(record_id),))
+        return _rows_to_frame(cur.fetchall(), DATASET_COLUMNS)
+
+# Oldest transaction still running (or the next one to start): every change
+# made below it has committed or rolled back, so it is visible to a later read
+SYNC_MARK_QUERY = "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS mark;"
+
+def load_changes_from_db(conn: PGConnection, since) -> tuple[pd.DataFrame, list[int], object]:
+    """
+    Fetches the quant_data rows touched since a high-water mark.
+
+    The mark is a transaction id, not a timestamp: rows are matched on the
+    transaction that wrote them (change_xid), so a transaction that commits long
+    after stamping its rows is still picked up by the next sync.
+    Requires the change tracking from migrations/001_quant_data_sync.sql and
+    migrations/008_quant_data_change_xid.sql.
+
+    Args:
+        conn (PGConnection): Open database connection.
+        since: High-water mark returned by the previous sync, or None for a full read.
+
+    Returns:
+        tuple: A tuple containing:
+            - pd.DataFrame: Inserted/updated rows in any status (untransformed).
+            - list[int]: Ids deleted since the mark.
+            - The new high-water mark.
+    """
+    with conn.cursor() as cur:
+        # Read the mark first; transactions still running get ids at or above it
+        cur.execute(SYNC_MARK_QUERY)
+        hwm = cur.fetchone()[0]
+
+        if since is None:
+            changed = load_data_from_db(conn)
+            deleted_ids = []
+        else:
+            columns = DATASET_COLUMNS + ['status']
+            cur.execute(
+                f"SELECT {', '.join(columns)} FROM quant_data"
+                " WHERE change_xid >= %(since)s::text::xid8;", {'since': since}
             )
-    
+            changed = _rows_to_frame(cur.fetchall(), columns)
+            cur.execute(
+                "SELECT id FROM quant_data_tombstones WHERE change_xid >= %(since)s::text::xid8;",
+                {'since': since}
+            )
+            deleted_ids = [row[0] for row in cur.fetchall()]
+
+    logger.debug('Fetched %s changed and %s deleted rows', len(changed), len(deleted_ids))
+    return changed, deleted_ids, hwm
+
+def apply_changes(resident: pd.DataFrame, changed: pd.DataFrame, deleted_ids: list[int]) -> pd.DataFrame:
+    """
+    Merges a delta from load_changes_from_db into an already transformed dataset.
+
+    Rows that were deleted or changed are dropped from `resident`; changed rows
+    that are (still) APPROVED are transformed and appended.
+
+    Args:
+        resident (pd.DataFrame): The transformed dataset currently in memory.
+        changed (pd.DataFrame): Untransformed changed rows in any status.
+        deleted_ids (list[int]): Ids removed from quant_data.
+
+    Returns:
+        pd.DataFrame: The refreshed, transformed dataset.
+    """
+    touched = set(deleted_ids) | set(changed['id'].tolist())
+    if not touched:
+        return resident
+
+    kept = resident[~resident['id'].isin(touched)]
+    approved = changed[changed['status'] == 'APPROVED']
+    if approved.empty:
+        return kept.reset_index(drop=True)
+
+    approved = transform_db_data(approved.drop(columns=['status']))
+    return pd.concat([kept, approved], ignore_index=True)
+
+def sync_transform_data(resident: pd.DataFrame | None, since) -> tuple[pd.DataFrame, object]:
+    """
+    Incremental counterpart of load_transform_data('db').
+
+    Without a resident dataset (or high-water mark) the approved rows are read in
+    full; otherwise only the rows changed since `since` are fetched, transformed
+    and merged.
+
+    Returns:
+        tuple: The transformed dataset and the new high-water mark.
+    """
+    if resident is None:
+        since = None
+    with pooled_connection() as conn:
+        changed, deleted_ids, hwm = load_changes_from_db(conn, since)
+
+    if since is None:
+        return transform_db_data(changed), hwm
+    return apply_changes(resident, changed, deleted_ids), hwm
+
+# Statuses of the submissions waiting for moderation
+PENDING_STATUSES = ['PENDING', 'UPDATE REQUESTED']
+
+def load_pending_page_from_db(conn: PGConnection, before_id: int | None = None,
+                              limit: int = 25) -> list[dict]:
+    """
+    Loads one page of the submissions waiting for moderation, newest first.
+
+    Pages are keyset-paginated on id: pass the last id of the previous page as
+    `before_id`, so the cost of a page does not grow with the backlog.
+
+    Args:
+        conn (PGConnection): Open database connection.
+        before_id (int | None): Only rows with a smaller id; None for the first page.
+        limit (int): Page size.
+
+    Returns:
+        list[dict]: Rows of quant_data.
+    """
+    query = "SELECT * FROM quant_data WHERE status = ANY(%(statuses)s)"
+    if before_id is not None:
+        query += " AND id < %(before_id)s"
+    query += " ORDER BY id DESC LIMIT %(limit)s;"
+    params = {'statuses': PENDING_STATUSES, 'before_id': before_id, 'limit': int(limit)}
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(query, params)
+        return cur.fetchall()
+
+def count_pending_in_db(conn: PGConnection) -> int:
+    """
+    Number of submissions waiting for moderation.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM quant_data WHERE status = ANY(%s);", (PENDING_STATUSES,))
+        return cur.fetchone()[0]
+
+# Sortable columns of the admin table. NULLs are mapped to a value below every
+# real one so the (sort key, id) keyset comparison stays well defined.
+TABLE_SORT_EXPRESSIONS = {
+    'id': "id",
+    'reference': "COALESCE(reference, '')",
+    'date': "COALESCE(date, '0001-01-01'::date)",
+    'num_qubits': "COALESCE(num_qubits, -1)",
+    'num_2q_gates': "COALESCE(num_2q_gates, -1)",
+    'total_gates': "COALESCE(total_gates, -1)",
+    'circuit_depth': "COALESCE(circuit_depth, -1)",
+    'institution': "COALESCE(institution, '')",
+    'computer': "COALESCE(computer, '')",
+    'status': "COALESCE(status, '')",
+}
+
+def _table_filter(search: str | None, status: str | None) -> tuple[str, dict]:
+    clauses, params = [], {}
+    if search:
+        # Served by the trigram indexes of migrations/007 (selective from three characters on)
+        clauses.append("(reference ILIKE %(search)s OR institution ILIKE %(search)s OR computer ILIKE %(search)s)")
+        # ILIKE wildcards in the search term match themselves
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params['search'] = f"%{escaped}%"
+    if status:
+        clauses.append("status = %(status)s")
+        params['status'] = status
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def table_page_query(sort_column: str = 'id', descending: bool = True,
+                     search: str | None = None, status: str | None = None,
+                     after: tuple | None = None, limit: int = 50) -> tuple[str, dict]:
+    """
+    Builds the query of load_table_page_from_db; returns the SQL and its parameters.
+
+    Every sort key has a (sort key, id) index from migrations/007, so a page
+    is an index range scan wherever it starts.
+    """
+    expression = TABLE_SORT_EXPRESSIONS[sort_column]
+    direction = "DESC" if descending else "ASC"
+    where, params = _table_filter(search, status)
+    if after is not None:
+        where += " AND " if where else " WHERE "
+        where += f"({expression}, id) {'<' if descending else '>'} (%(after_key)s, %(after_id)s)"
+        params['after_key'], params['after_id'] = after
+    params['limit'] = int(limit)
+    query = (
+        f"SELECT *, {expression} AS sort_key FROM quant_data{where}"
+        f" ORDER BY {expression} {direction}, id {direction} LIMIT %(limit)s;"
+    )
+    return query, params
+
+def load_table_page_from_db(conn: PGConnection, sort_column: str = 'id', descending: bool = True,
+                            search: str | None = None, status: str | None = None,
+                            after: tuple | None = None, limit: int = 50) -> list[dict]:
+    """
+    Loads one page of quant_data for the admin table, sorted and filtered in SQL.
+
+    Pages are keyset-paginated on (sort key, id): pass the `sort_key` and `id`
+    of the last row of the previous page as `after`.
+
+    Args:
+        conn (PGConnection): Open database connection.
+        sort_column (str): One of TABLE_SORT_EXPRESSIONS.
+        descending (bool): Sort direction.
+        search (str | None): Case-insensitive substring of reference, institution or computer.
+        status (str | None): Only rows with this status.
+        after (tuple | None): (sort key, id) of the last row of the previous page.
+        limit (int): Page size.
+
+    Returns:
+        list[dict]: Rows of quant_data, each with its `sort_key`.
+    """
+    query, params = table_page_query(sort_column, descending, search, status, after, limit)
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(query, params)
+        return cur.fetchall()
+
+# Above this many rows the unfiltered admin table shows the planner's row
+# estimate instead of running count(*) over the whole table
+EXACT_COUNT_LIMIT = 10000
+
+def table_count_query(search: str | None = None, status: str | None = None) -> tuple[str, dict]:
+    """
+    Builds the exact count query of count_table_rows_in_db; returns the SQL and its parameters.
+    """
+    where, params = _table_filter(search, status)
+    return f"SELECT count(*) FROM quant_data{where};", params
+
+def count_table_rows_in_db(conn: PGConnection, search: str | None = None,
+                           status: str | None = None) -> tuple[int, bool]:
+    """
+    Number of quant_data rows matching the admin table filters.
+
+    Returns:
+        tuple: The count and whether it is exact (False for the statistics
+        estimate used on large unfiltered tables).
+    """
+    with conn.cursor() as cur:
+        if not search and not status:
+            cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = 'quant_data'::regclass;")
+            estimate = cur.fetchone()[0]
+            if estimate > EXACT_COUNT_LIMIT:
+                return estimate, False
+        cur.execute(*table_count_query(search, status))
+        return cur.fetchone()[0], True
+
+def load_row_from_db(conn: PGConnection, record_id: int) -> dict | None:
+    """
+    Loads a single quant_data row by id, whatever its status.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("SELECT * FROM quant_data WHERE id = %s;", (int(record_id),))
+        return cur.fetchone()
+
+def load_comp_data_from_db()->pd.DataFrame:
     query = "SELECT * FROM quantum_computers;"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    with pooled_connection() as conn:
+        df = pd.read_sql_query(query, conn)
     return df
 
 def clean_error_mitigation(x):
@@ -195,11 +761,58 @@ def clean_error_mitigation(x):
         return 'No Data'
     return x
 
+# Display names of the quant_data columns
+DISPLAY_COLUMNS = {
+    'reference': 'Reference',
+    'date': 'Date',
+    'computation': 'Computation',
+    'num_qubits': 'Number of qubits',
+    'num_2q_gates': 'Number of two-qubit gates',
+    'num_1q_gates': 'Number of single-qubit gates',
+    'total_gates':'Total number of gates',
+    'circuit_depth':'Circuit depth',
+    'circuit_depth_measure':'Circuit depth measure',
+    'institution':'Institution',
+    'computer':	'Computer',
+    #'error_mitigation':'Error mitigation',
+}
+
+def _strip_or_unnamed(values: pd.Series) -> pd.Series:
+    """
+    Strips whitespace and replaces missing or blank values with 'Unnamed'.
+
+    The work is done once per distinct value, which for institution and
+    computer names is a handful, and then broadcast back to the rows.
+    """
+    codes, uniques = pd.factorize(values)
+    cleaned = pd.Series(uniques, dtype=object).str.strip()
+    cleaned = cleaned.mask(cleaned == '', 'Unnamed').fillna('Unnamed')
+    # Missing values have code -1, which picks the trailing 'Unnamed'
+    lookup = np.append(cleaned.to_numpy(dtype=object), 'Unnamed')
+    return pd.Series(lookup[codes], index=values.index, dtype=object)
+
 def transform_db_data(df: pd.DataFrame)->pd.DataFrame:
+    """
+    Brings rows of quant_data into display shape: joined Computations, Year,
+    imputed Institution / Computer and display column names.
+
+    Every step runs once over whole columns and the frame is modified in
+    place, so callers must pass a frame they own.
+
+    Args:
+        df (pd.DataFrame): Rows of quant_data.
+
+    Returns:
+        pd.DataFrame: The transformed dataset (the same object as `df`).
+    """
+    # Change-tracking column (migrations/001) is not part of the display dataset
+    if 'updated_at' in df.columns:
+        del df['updated_at']
 
     # Feature Engineering
-    df['Computations'] = df['computation'].apply(
-    lambda x: ', '.join(x) if isinstance(x, list) else ''
+    df['Computations'] = pd.Series(
+        [', '.join(x) if isinstance(x, list) else '' for x in df['computation'].tolist()],
+        index=df.index, dtype=object,
     )
     # df['Error mitigations'] = df['error_mitigation'].apply(
     # lambda x: ', '.join(x) if isinstance(x, list) else ''
@@ -207,38 +820,46 @@ def transform_db_data(df: pd.DataFrame)->pd.DataFrame:
     df['Year'] = pd.to_datetime(df['date'], errors='coerce').dt.year
 
     # Imputing missing values
-    df['institution'] = df['institution'].astype(str).str.strip()
-    df['institution'] = df['institution'].replace('', np.nan).fillna('Unnamed')
+    df['institution'] = _strip_or_unnamed(df['institution'])
+    df['computer'] = _strip_or_unnamed(df['computer'])
+
+    # # Handle error_mitigation: Replace NaN or empty lists with 'No Data'
+    # df['Error mitigations'] = df['Error mitigations'].apply(clean_error_mitigation)
 
-    df['computer'] = df['computer'].astype(str).str.strip()
-    df['computer'] = df['computer'].replace('', np.nan).fillna('Unnamed')
+    df.rename(columns=DISPLAY_COLUMNS, inplace=True)
+    return df
 
-    df['institution'] = df['institution'].astype(str).str.strip()
-    df['institution'] = df['institution'].replace('', np.nan).fillna('Unnamed')
+def approved_view_mode() -> bool:
+    """
+    DB_APPROVED_VIEW=1 loads the 'db' dataset from the approved_view materialized
+    view (migrations/006_approved_view.sql), which is already in display shape.
+    """
+    return os.getenv("DB_APPROVED_VIEW", "0").strip().lower() in ("1", "true", "yes")
 
-    # df['error_mitigation'] = df['error_mitigation'].apply(
-    # lambda x: ['No Data'] if isinstance(x, list) and len(x) == 0 else x
-    # )
+# Columns of approved_view, in the order transform_db_data produces them
+APPROVED_VIEW_COLUMNS = (
+    [DISPLAY_COLUMNS.get(col, col) for col in DATASET_COLUMNS] + ['Computations', 'Year']
+)
+APPROVED_VIEW_NUMERIC = [DISPLAY_COLUMNS.get(col, col) for col in NUMERIC_COLUMNS] + ['Year']
 
-    # # Handle error_mitigation: Replace NaN or empty lists with 'No Data'
-    # df['Error mitigations'] = df['Error mitigations'].apply(clean_error_mitigation)
+def load_approved_view_from_db(conn: PGConnection, chunk_size: int = FETCH_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Loads the transformed approved dataset from approved_view.
 
-    # Rename columns
-    df = df.rename(columns={
-    'reference': 'Reference',
-    'date': 'Date',
-    'computation': 'Computation',
-    'num_qubits': 'Number of qubits',
-    'num_2q_gates': 'Number of two-qubit gates',
-    'num_1q_gates': 'Number of single-qubit gates',
-    'total_gates':'Total number of gates',
-    'circuit_depth':'Circuit depth',
-    'circuit_depth_measure':'Circuit depth measure',
-    'institution':'Institution',
-    'computer':	'Computer',	
-    #'error_mitigation':'Error mitigation',
-    })
+    The view does in SQL what transform_db_data does in pandas, once per
+    refresh instead of once per load, so this is a plain (streamed) fetch.
+
+    Args:
+        conn (PGConnection): Open database connection.
+        chunk_size (int): Rows per fetch.
 
+    Returns:
+        pd.DataFrame: The same frame as transform_db_data(load_data_from_db(conn)).
+    """
+    query = "SELECT " + ", ".join(f'"{col}"' for col in APPROVED_VIEW_COLUMNS) + " FROM approved_view;"
+    df, chunks = _stream_rows(conn, query, APPROVED_VIEW_COLUMNS, "load_approved_view",
+                              chunk_size, APPROVED_VIEW_NUMERIC)
+    logger.debug('Loaded %s rows from approved_view in %s chunk(s)', len(df), chunks)
     return df
 
 def load_transform_data(data_source : str)->pd.DataFrame:
@@ -252,18 +873,13 @@ def load_transform_data(data_source : str)->pd.DataFrame:
         df = add_custom_columns(df,repeated_columns)
         df = rename_missing_data(df)
         return df
+    elif approved_view_mode():
+        with pooled_connection() as conn:
+            return load_approved_view_from_db(conn)
     else:
-        conn = psycopg2.connect(
-        host="localhost",
-        database=os.getenv("DB_NAME"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        port="5432"
-    )
-        
-        df = load_data_from_db(conn)
+        with pooled_connection() as conn:
+            df = load_data_from_db(conn)
         df = transform_db_data(df)
-        conn.close()
         return df
 
 #load_transform_data('db')
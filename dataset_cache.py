@@ -0,0 +1,349 @@
+# Import necessary libraries
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple
+import pandas as pd
+from psycopg2 import OperationalError
+from psycopg2.pool import PoolError
+from snapshot import save_snapshot, load_snapshot
+from db import pooled_connection
+from data_ingestion import (
+    load_transform_data, sync_transform_data, transform_db_data,
+    load_filter_options_from_db, load_filtered_data_from_db,
+    load_pending_page_from_db, count_pending_in_db,
+)
+
+# Setting up logger object for console logging
+logger = logging.getLogger("dataset_cache")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+# Process-wide dataset version, bumped by every write to quant_data made by this
+# process and, with DB_LISTEN enabled, by writes from other workers
+_version = 0
+_version_lock = threading.Lock()
+
+
+class _Entry(NamedTuple):
+    version: int        # dataset version the frame was loaded at
+    df: pd.DataFrame    # transformed dataset
+    hwm: object         # incremental-sync high-water mark
+    loaded_at: float    # time.monotonic() of the load
+    reconcile: bool = False  # booted from a snapshot: reload in the background even if young
+
+
+# data_source -> _Entry, replaced as a whole so readers never see a half-updated entry
+_entries = {}
+
+# Errors meaning "the source is unreachable", for which the last good dataset is served
+SOURCE_ERRORS = (OperationalError, PoolError, OSError)
+
+# Stale-while-revalidate policy, in seconds: past the soft TTL (or after a version
+# bump) the cached dataset is still served while one background thread reloads it;
+# past the hard TTL requests wait for the reload. Failed reloads are retried after
+# an exponentially growing delay.
+SOFT_TTL = float(os.getenv("DATASET_SOFT_TTL", "300"))
+HARD_TTL = float(os.getenv("DATASET_HARD_TTL", "3600"))
+ERROR_BACKOFF = float(os.getenv("DATASET_ERROR_BACKOFF", "5"))
+ERROR_BACKOFF_MAX = float(os.getenv("DATASET_ERROR_BACKOFF_MAX", "300"))
+# Sources with a background reload in flight, and data_source -> (consecutive failures, retry-at)
+_refreshing = set()
+_failures = {}
+_refresh_guard = threading.Lock()
+# (dataset version, query) -> (result, loaded at) of filtered / moderation-queue queries, least recently used first
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "64"))
+_query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+_load_locks = {}
+_load_locks_guard = threading.Lock()
+
+
+def dataset_version() -> int:
+    """
+    Returns the current dataset version.
+    """
+    return _version
+
+def bump_dataset_version() -> int:
+    """
+    Marks every cached dataset as stale. Call after committing a write to quant_data.
+
+    Returns:
+        int: The new dataset version.
+    """
+    global _version
+    with _version_lock:
+        _version += 1
+        logger.debug('Dataset version bumped to %s', _version)
+        return _version
+
+def incremental_mode() -> bool:
+    """
+    DB_REFRESH_MODE=incremental refreshes the 'db' dataset from row deltas
+    (needs migrations/001_quant_data_sync.sql); the default 'full' reloads it.
+    """
+    return os.getenv("DB_REFRESH_MODE", "full").strip().lower() == "incremental"
+
+def sql_filter_mode() -> bool:
+    """
+    FILTER_MODE=sql applies the Visualization filters in SQL (see
+    get_filtered_dataset) instead of loading the whole dataset.
+    """
+    return os.getenv("FILTER_MODE", "pandas").strip().lower() == "sql"
+
+def _refresh(data_source: str, entry: tuple | None) -> tuple:
+    """
+    Produces the (dataframe, high-water mark) pair for a stale or missing entry.
+    """
+    if data_source == 'db' and incremental_mode():
+        resident, since = (entry.df, entry.hwm) if entry is not None else (None, None)
+        return sync_transform_data(resident, since)
+    return load_transform_data(data_source), None
+
+def _load_lock(data_source: str) -> threading.Lock:
+    with _load_locks_guard:
+        return _load_locks.setdefault(data_source, threading.Lock())
+
+def _make_entry(data_source: str, version: int, df: pd.DataFrame, hwm, loaded_at: float,
+                reconcile: bool = False) -> _Entry:
+    # Identifies this exact frame to caches of derived data (see chart_options)
+    df.attrs["dataset_key"] = (data_source, version, loaded_at)
+    return _Entry(version, df, hwm, loaded_at, reconcile)
+
+def _store(data_source: str, version: int, df: pd.DataFrame, hwm) -> _Entry:
+    """
+    Installs a freshly loaded dataset and persists it as the new snapshot in the background.
+    """
+    entry = _make_entry(data_source, version, df, hwm, time.monotonic())
+    _entries[data_source] = entry
+    with _refresh_guard:
+        _failures.pop(data_source, None)
+    threading.Thread(target=save_snapshot, args=(data_source, df, hwm), daemon=True).start()
+    logger.debug('Loaded %s dataset at version %s (%s rows)', data_source, version, len(df))
+    return entry
+
+def _age(entry: _Entry) -> float:
+    return time.monotonic() - entry.loaded_at
+
+def _is_outdated(entry: _Entry) -> bool:
+    """
+    True when a write was committed (bump_dataset_version) since the entry was loaded.
+    """
+    return entry.version != _version
+
+def _is_stale(entry: _Entry) -> bool:
+    return entry.reconcile or _is_outdated(entry) or _age(entry) >= SOFT_TTL
+
+def _in_backoff(data_source: str) -> bool:
+    with _refresh_guard:
+        return time.monotonic() < _failures.get(data_source, (0, 0.0))[1]
+
+def _record_failure(data_source: str, error: Exception) -> None:
+    with _refresh_guard:
+        failures = _failures.get(data_source, (0, 0.0))[0] + 1
+        delay = min(ERROR_BACKOFF * 2 ** (failures - 1), ERROR_BACKOFF_MAX)
+        _failures[data_source] = (failures, time.monotonic() + delay)
+    logger.error('Could not refresh %s dataset (%s failure(s) in a row), retrying in %.1fs: %s',
+                 data_source, failures, delay, error)
+
+def _revalidate(data_source: str) -> None:
+    """
+    Reloads a stale dataset in the background and swaps it in.
+    """
+    try:
+        with _load_lock(data_source):
+            entry = _entries.get(data_source)
+            if entry is not None and not _is_stale(entry):
+                return
+            version = _version
+            try:
+                df, hwm = _refresh(data_source, entry)
+            except Exception as e:
+                _record_failure(data_source, e)
+                return
+            _store(data_source, version, df, hwm)
+    finally:
+        with _refresh_guard:
+            _refreshing.discard(data_source)
+
+def _start_revalidation(data_source: str) -> None:
+    """
+    Starts the background reload of `data_source` unless one is already
+    running or the last one failed too recently.
+    """
+    with _refresh_guard:
+        if data_source in _refreshing:
+            return
+        if time.monotonic() < _failures.get(data_source, (0, 0.0))[1]:
+            return
+        _refreshing.add(data_source)
+    threading.Thread(target=_revalidate, args=(data_source,),
+                     name=f"dataset-refresh-{data_source}", daemon=True).start()
+
+def _snapshot_age(stamp: dict) -> float:
+    try:
+        return max(0.0, time.time() - datetime.fromisoformat(stamp["created_at"]).timestamp())
+    except (KeyError, TypeError, ValueError):
+        return float("inf")
+
+def get_dataset(data_source: str) -> pd.DataFrame:
+    """
+    Returns the transformed dataset for `data_source` (stale-while-revalidate).
+
+    A cached dataset older than DATASET_SOFT_TTL is still returned right away,
+    while a single background thread reloads it and swaps the new one in. A
+    missing dataset, one older than DATASET_HARD_TTL, or one loaded before the
+    current dataset version (i.e. before a write was committed) is loaded while
+    the caller waits, so writes show up on the next run; concurrent sessions
+    share that load. The returned frame is shared by every session
+    (and indexed by record_store) and must not be modified; copy it first.
+
+    A worker without a dataset in memory boots from the on-disk snapshot and
+    reconciles it with the source in the background. When the source is
+    unreachable the last good dataset keeps being served, and reloads are
+    retried with exponential backoff.
+
+    Args:
+        data_source (str): 'db' or 'sheet', as accepted by load_transform_data.
+
+    Returns:
+        pd.DataFrame: The cached, transformed dataset (read-only).
+    """
+    entry = _entries.get(data_source)
+    if entry is not None and _age(entry) < HARD_TTL and not _is_outdated(entry):
+        if _is_stale(entry):
+            _start_revalidation(data_source)
+        return entry.df
+
+    with _load_lock(data_source):
+        # Another session may have reloaded while we were waiting
+        entry = _entries.get(data_source)
+        if entry is None:
+            snapshot = load_snapshot(data_source)
+            if snapshot is not None:
+                df, stamp = snapshot
+                # Served at once like a TTL-stale dataset, and always reconciled with the source
+                entry = _make_entry(data_source, _version, df, stamp.get("hwm"),
+                                    time.monotonic() - _snapshot_age(stamp), reconcile=True)
+                _entries[data_source] = entry
+
+        usable = entry is not None and _age(entry) < HARD_TTL and not _is_outdated(entry)
+        if entry is not None and (usable or _in_backoff(data_source)):
+            if _is_stale(entry):
+                _start_revalidation(data_source)
+            return entry.df
+
+        version = _version
+        try:
+            df, hwm = _refresh(data_source, entry)
+        except SOURCE_ERRORS as e:
+            if entry is None:
+                raise
+            _record_failure(data_source, e)
+            logger.error('Serving an out-of-date %s dataset (%.0fs old)', data_source, _age(entry))
+            return entry.df
+        entry = _store(data_source, version, df, hwm)
+    return entry.df
+
+def _normalize_filters(institutions, computers, years) -> tuple:
+    return (
+        tuple(sorted({str(i) for i in institutions})),
+        tuple(sorted({str(c) for c in computers})),
+        tuple(sorted({int(y) for y in years})),
+    )
+
+def _cached_query(key: tuple, load):
+    """
+    Returns the cached result for `key`, calling `load()` and caching its result
+    on a miss. Entries of older dataset versions are dropped on insert.
+
+    The dataset version only moves when this worker writes or (with DB_LISTEN)
+    hears of a write, so entries also expire after DATASET_SOFT_TTL to pick up
+    changes made elsewhere.
+    """
+    with _query_cache_lock:
+        cached = _query_cache.get(key)
+        if cached is not None:
+            result, loaded_at = cached
+            if time.monotonic() - loaded_at < SOFT_TTL:
+                _query_cache.move_to_end(key)
+                return result
+            del _query_cache[key]
+
+    result = load()
+    with _query_cache_lock:
+        for stale in [k for k in _query_cache if k[0] != key[0]]:
+            del _query_cache[stale]
+        _query_cache[key] = (result, time.monotonic())
+        while len(_query_cache) > QUERY_CACHE_SIZE:
+            _query_cache.popitem(last=False)
+    return result
+
+def get_pending_page(before_id: int | None, limit: int) -> list[dict]:
+    """
+    Returns one keyset page of the moderation queue (see
+    load_pending_page_from_db), cached per dataset version.
+    """
+    def load():
+        with pooled_connection() as conn:
+            return load_pending_page_from_db(conn, before_id, limit)
+    return _cached_query((_version, 'pending', before_id, limit), load)
+
+def get_pending_count() -> int:
+    """
+    Returns the size of the moderation queue, cached per dataset version.
+    """
+    def load():
+        with pooled_connection() as conn:
+            return count_pending_in_db(conn)
+    return _cached_query((_version, 'pending count'), load)
+
+def get_filter_options() -> pd.DataFrame:
+    """
+    Returns the distinct Institution / Computer / Year combinations of the
+    approved dataset, cached per dataset version.
+    """
+    def load():
+        with pooled_connection() as conn:
+            return load_filter_options_from_db(conn)
+    return _cached_query((_version, 'options'), load)
+
+def get_filtered_dataset(institutions: list[str], computers: list[str], years: list[int]) -> pd.DataFrame:
+    """
+    Returns the transformed approved rows matching the Visualization filters.
+
+    Results are fetched with the filters applied in SQL and memoized in an LRU
+    cache keyed by the dataset version and the normalized filter selection. The
+    returned frame is shared and must not be modified.
+
+    Args:
+        institutions (list[str]): Selected institutions.
+        computers (list[str]): Selected computers.
+        years (list[int]): Selected years.
+
+    Returns:
+        pd.DataFrame: The transformed, filtered dataset (read-only).
+    """
+    filters = _normalize_filters(institutions, computers, years)
+    key = (_version, filters)
+
+    def load():
+        with pooled_connection() as conn:
+            raw = load_filtered_data_from_db(conn, *filters)
+        df = transform_db_data(raw)
+        # Reloads after the TTL get a new key so derived caches do not serve the old result
+        df.attrs["dataset_key"] = ('filtered',) + key + (time.monotonic(),)
+        logger.debug('Loaded %s filtered rows', len(df))
+        return df
+    return _cached_query(key, load)
@@ -0,0 +1,276 @@
+# Import necessary libraries
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from dotenv import load_dotenv
+import psycopg2
+from psycopg2.pool import PoolError
+from psycopg2.extensions import connection as PGConnection, TRANSACTION_STATUS_IDLE
+
+load_dotenv()
+
+# Setting up logger object for console logging
+logger = logging.getLogger("db")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+
+class PoolTimeout(PoolError):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+def connect() -> PGConnection:
+    """
+    Opens a new PostgreSQL connection using the settings from the environment
+    """
+    return psycopg2.connect(
+        host="localhost",
+        database=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        port="5432"
+    )
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of PostgreSQL connections shared by every
+    Streamlit session of the process.
+
+    Connections are opened on demand up to `maxconn`; callers beyond that wait
+    up to `timeout` seconds for one to be returned. A connection that has been
+    idle longer than `validate_after` seconds is pinged before it is handed
+    out, and closed or broken connections are transparently replaced.
+
+    Args:
+        maxconn (int): Maximum number of open connections.
+        timeout (float): Seconds to wait for a free connection before raising PoolTimeout.
+        validate_after (float): Idle seconds after which a connection is pinged on checkout.
+        connect (callable): Factory returning a new connection.
+    """
+
+    def __init__(self, maxconn: int = 10, timeout: float = 10.0,
+                 validate_after: float = 30.0, connect=connect):
+        if maxconn < 1:
+            raise ValueError("maxconn must be at least 1")
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.validate_after = validate_after
+        self._connect = connect
+        self._cond = threading.Condition()
+        self._idle = []  # (connection, returned_at) pairs, most recent last
+        self._in_use = 0
+        self._closed = False
+        self._backend_pids = {}  # connection -> server process id, for every open connection
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "connects": 0,
+            "reconnects": 0,
+            "checkout_time_total": 0.0,
+            "checkout_time_max": 0.0,
+        }
+
+    def _is_alive(self, conn: PGConnection, idle_for: float) -> bool:
+        if conn.closed:
+            return False
+        if idle_for < self.validate_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn: PGConnection) -> None:
+        with self._cond:
+            self._backend_pids.pop(conn, None)
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def getconn(self) -> PGConnection:
+        """
+        Checks a connection out of the pool, waiting for one if the pool is exhausted.
+
+        Returns:
+            PGConnection: A live connection that must be handed back with `putconn`.
+        """
+        start = time.perf_counter()
+        with self._cond:
+            if self._closed:
+                raise PoolError("connection pool is closed")
+            if not self._idle and self._in_use >= self.maxconn:
+                self._stats["waits"] += 1
+                deadline = start + self.timeout
+                while not self._idle and self._in_use >= self.maxconn:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        if self._idle or self._in_use < self.maxconn:
+                            break
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"no database connection available after {self.timeout:.1f}s"
+                        )
+            entry = self._idle.pop() if self._idle else None
+            self._in_use += 1
+
+        try:
+            conn = None
+            if entry is not None:
+                conn, returned_at = entry
+                if not self._is_alive(conn, time.monotonic() - returned_at):
+                    logger.warning("Discarding dead pooled connection")
+                    self._discard(conn)
+                    conn = None
+                    with self._cond:
+                        self._stats["reconnects"] += 1
+            if conn is None:
+                conn = self._connect()
+                with self._cond:
+                    self._stats["connects"] += 1
+                    self._backend_pids[conn] = conn.get_backend_pid()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        elapsed = time.perf_counter() - start
+        with self._cond:
+            self._stats["checkouts"] += 1
+            self._stats["checkout_time_total"] += elapsed
+            self._stats["checkout_time_max"] = max(self._stats["checkout_time_max"], elapsed)
+        return conn
+
+    def putconn(self, conn: PGConnection, discard: bool = False) -> None:
+        """
+        Returns a connection to the pool. Any open transaction is rolled back;
+        closed connections, or ones flagged with `discard`, are dropped instead.
+        """
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or conn.closed or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks out a connection and always returns it.
+
+        Connections that raised a connection-level error are discarded so the
+        next checkout reconnects. Callers still commit explicitly.
+        """
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the pool counters.
+
+        Returns:
+            dict: size limits, in-use / idle counts, waits, timeouts, (re)connects
+            and average / max checkout latency in milliseconds.
+        """
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "max_size": self.maxconn,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "waits": self._stats["waits"],
+                "timeouts": self._stats["timeouts"],
+                "connects": self._stats["connects"],
+                "reconnects": self._stats["reconnects"],
+                "checkout_ms_avg": 1000 * self._stats["checkout_time_total"] / checkouts if checkouts else 0.0,
+                "checkout_ms_max": 1000 * self._stats["checkout_time_max"],
+            }
+
+    def backend_pids(self) -> set[int]:
+        """
+        Returns the server process ids of the connections the pool holds, idle
+        or checked out, e.g. to recognise this process's own NOTIFY messages.
+        """
+        with self._cond:
+            return set(self._backend_pids.values())
+
+    def closeall(self) -> None:
+        """
+        Closes every idle connection and refuses further checkouts.
+        """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    Sized by DB_POOL_MAX (default 10), DB_POOL_TIMEOUT seconds (default 10)
+    and DB_POOL_VALIDATE_AFTER seconds (default 30).
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    maxconn=int(os.getenv("DB_POOL_MAX", "10")),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                    validate_after=float(os.getenv("DB_POOL_VALIDATE_AFTER", "30")),
+                )
+                logger.debug('Connection pool created (max %s)', _pool.maxconn)
+    return _pool
+
+def pooled_connection():
+    """
+    Shortcut for `get_pool().connection()`.
+
+    Usage:
+        with pooled_connection() as conn:
+            ...
+    """
+    return get_pool().connection()
+
+def pool_stats() -> dict:
+    """
+    Returns the statistics of the process-wide pool.
+    """
+    return get_pool().stats()
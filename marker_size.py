@@ -0,0 +1,76 @@
+# Import necessary libraries
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Marker scalings offered next to the "Marker size" axis
+SCALES = ["Linear", "Log", "Rank"]
+
+# Size given to every marker when the values do not spread (a single row, all equal)
+DEGENERATE_SIZE = 0.5
+
+# (dataset key, column, scale) -> sizes, least recently used first
+CACHE_SIZE = 32
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _as_numbers(values: pd.Series) -> pd.Series:
+    """
+    Numeric view of a size column; dates become days since the epoch.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    dates = pd.to_datetime(values, errors='coerce')
+    return (dates - pd.Timestamp(0)).dt.total_seconds() / 86400
+
+def scale_sizes(values: pd.Series, scale: str = "Linear") -> pd.Series:
+    """
+    Maps a column to marker sizes in [0, 1] (larger value = larger marker).
+
+    Args:
+        values (pd.Series): Numbers or dates.
+        scale (str): 'Linear', 'Log' (log of the distance to the minimum) or
+            'Rank' (percentile rank, robust to outliers).
+
+    Returns:
+        pd.Series: Sizes in [0, 1], NaN where the value is missing. Columns
+        without spread get DEGENERATE_SIZE everywhere.
+    """
+    numbers = _as_numbers(values)
+    low, high = numbers.min(), numbers.max()
+    if pd.isna(low) or not high > low:
+        return numbers.where(numbers.isna(), DEGENERATE_SIZE)
+
+    if scale == "Rank":
+        ranks = numbers.rank(method='average')
+        return (ranks - 1) / (ranks.max() - 1)
+    if scale == "Log":
+        shifted = np.log1p(numbers - low)
+        return shifted / np.log1p(high - low)
+    return (numbers - low) / (high - low)
+
+def marker_sizes(df: pd.DataFrame, column: str, scale: str = "Linear") -> pd.Series:
+    """
+    scale_sizes of `df[column]`, cached per dataset.
+
+    Frames tagged with a "dataset_key" by dataset_cache are scaled once per
+    dataset version; untagged frames are scaled on every call.
+    """
+    dataset_key = df.attrs.get("dataset_key")
+    if dataset_key is None:
+        return scale_sizes(df[column], scale)
+
+    key = (dataset_key, column, scale)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    sizes = scale_sizes(df[column], scale)
+    with _lock:
+        _cache[key] = sizes
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return sizes
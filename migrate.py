@@ -0,0 +1,189 @@
+"""
+Versioned schema migrations.
+
+Applies the numbered SQL files of migrations/ that have not been applied yet,
+each in its own transaction, and records them in schema_migrations.
+
+Usage:
+    python migrate.py           # apply pending migrations
+    python migrate.py --list    # show applied and pending migrations
+"""
+# Import necessary libraries
+import os
+import re
+import sys
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from psycopg2 import OperationalError
+from psycopg2.extensions import connection as PGConnection
+from db import connect
+
+# Setting up logger object for console logging
+logger = logging.getLogger("migrate")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Serializes concurrent runners (e.g. several app workers starting at once)
+ADVISORY_LOCK_KEY = 7_314_202
+
+# Seconds before migrate_on_start tries again after the database was unreachable
+RETRY_AFTER = 30.0
+
+_applied_on_start = False
+_next_attempt = 0.0
+_start_lock = threading.Lock()
+
+
+def migration_files(directory: str = MIGRATIONS_DIR) -> list[tuple[str, str]]:
+    """
+    Returns the (version, path) pairs of the migrations, in version order.
+
+    A migration is a file named <digits>_<description>.sql; its version is the digits.
+    """
+    files = []
+    for name in os.listdir(directory):
+        match = re.match(r"(\d+)_.*\.sql$", name)
+        if match:
+            files.append((match.group(1), os.path.join(directory, name)))
+    return sorted(files, key=lambda f: int(f[0]))
+
+def _checksum(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _ensure_table(conn: PGConnection) -> None:
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version     text PRIMARY KEY,
+                name        text NOT NULL,
+                checksum    text NOT NULL,
+                applied_at  timestamptz NOT NULL DEFAULT now()
+            );
+        """)
+    conn.commit()
+
+def applied_migrations(conn: PGConnection) -> dict[str, str]:
+    """
+    Returns version -> checksum of the migrations already applied.
+    """
+    _ensure_table(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT version, checksum FROM schema_migrations;")
+        rows = cur.fetchall()
+    conn.commit()
+    return dict(rows)
+
+def apply_migrations(conn: PGConnection, directory: str = MIGRATIONS_DIR) -> list[str]:
+    """
+    Applies every pending migration, each in its own transaction.
+
+    Migrations applied earlier whose file has since changed are reported but
+    not re-run. A failing migration is rolled back and stops the run.
+
+    Args:
+        conn (PGConnection): Open database connection.
+        directory (str): Folder holding the migration files.
+
+    Returns:
+        list[str]: Versions applied by this run.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s);", (ADVISORY_LOCK_KEY,))
+    try:
+        applied = applied_migrations(conn)
+        done = []
+        for version, path in migration_files(directory):
+            checksum = _checksum(path)
+            if version in applied:
+                if applied[version] != checksum:
+                    logger.warning('Migration %s changed after it was applied', os.path.basename(path))
+                continue
+            with open(path) as f:
+                sql = f.read()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(sql)
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s);",
+                        (version, os.path.basename(path), checksum),
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                logger.error('Migration %s failed', os.path.basename(path))
+                raise
+            logger.debug('Applied migration %s', os.path.basename(path))
+            done.append(version)
+        return done
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s);", (ADVISORY_LOCK_KEY,))
+        conn.commit()
+
+def migrate_on_start() -> bool:
+    """
+    Applies pending migrations once per process when DB_MIGRATE is set to 1/true.
+
+    An unreachable database is logged rather than raised, so the app can keep
+    serving its snapshot; the migrations are retried on a run at least
+    RETRY_AFTER seconds later.
+
+    Returns:
+        bool: True once the migrations have been applied in this process.
+    """
+    global _applied_on_start, _next_attempt
+    if os.getenv("DB_MIGRATE", "0").strip().lower() not in ("1", "true", "yes"):
+        return False
+    with _start_lock:
+        if _applied_on_start:
+            return True
+        if time.monotonic() < _next_attempt:
+            return False
+        try:
+            conn = connect()
+            try:
+                apply_migrations(conn)
+            finally:
+                conn.close()
+        except (OperationalError, OSError) as e:
+            _next_attempt = time.monotonic() + RETRY_AFTER
+            logger.error('Could not apply migrations, retrying in %.0fs: %s', RETRY_AFTER, e)
+            return False
+        _applied_on_start = True
+        return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--list', action='store_true', help='show migrations without applying them')
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        if args.list:
+            applied = applied_migrations(conn)
+            for version, path in migration_files():
+                state = "applied" if version in applied else "pending"
+                print(f"{state:>8}  {os.path.basename(path)}")
+            return 0
+        done = apply_migrations(conn)
+        print(f"Applied {len(done)} migration(s)" + (f": {', '.join(done)}" if done else ""))
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
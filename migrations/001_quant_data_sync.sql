@@ -0,0 +1,40 @@
+-- Change tracking for incremental dataset refresh (DB_REFRESH_MODE=incremental).
+-- Every insert/update stamps updated_at; every delete leaves a tombstone.
+
+ALTER TABLE quant_data
+    ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT clock_timestamp();
+
+CREATE INDEX IF NOT EXISTS quant_data_updated_at_idx ON quant_data (updated_at);
+
+CREATE OR REPLACE FUNCTION quant_data_touch() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS quant_data_touch ON quant_data;
+CREATE TRIGGER quant_data_touch
+    BEFORE INSERT OR UPDATE ON quant_data
+    FOR EACH ROW EXECUTE FUNCTION quant_data_touch();
+
+CREATE TABLE IF NOT EXISTS quant_data_tombstones (
+    id          integer PRIMARY KEY,
+    deleted_at  timestamptz NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE INDEX IF NOT EXISTS quant_data_tombstones_deleted_at_idx
+    ON quant_data_tombstones (deleted_at);
+
+CREATE OR REPLACE FUNCTION quant_data_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO quant_data_tombstones (id) VALUES (OLD.id)
+    ON CONFLICT (id) DO UPDATE SET deleted_at = clock_timestamp();
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS quant_data_tombstone ON quant_data;
+CREATE TRIGGER quant_data_tombstone
+    AFTER DELETE ON quant_data
+    FOR EACH ROW EXECUTE FUNCTION quant_data_tombstone();
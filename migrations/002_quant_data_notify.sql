@@ -0,0 +1,25 @@
+-- Cross-process cache invalidation (DB_LISTEN=1).
+-- Every insert, update (including status changes) and delete on quant_data
+-- emits a NOTIFY on the quant_data_changed channel.
+
+CREATE OR REPLACE FUNCTION quant_data_notify() RETURNS trigger AS $$
+DECLARE
+    changed quant_data%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    PERFORM pg_notify(
+        'quant_data_changed',
+        json_build_object('op', TG_OP, 'id', changed.id, 'status', changed.status)::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS quant_data_notify ON quant_data;
+CREATE TRIGGER quant_data_notify
+    AFTER INSERT OR UPDATE OR DELETE ON quant_data
+    FOR EACH ROW EXECUTE FUNCTION quant_data_notify();
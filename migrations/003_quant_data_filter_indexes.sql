@@ -0,0 +1,14 @@
+-- Indexes backing the SQL filter mode of the Visualization tab (FILTER_MODE=sql).
+-- The expressions must match FILTER_EXPRESSIONS in data_ingestion.py.
+
+CREATE INDEX IF NOT EXISTS quant_data_approved_filters_idx
+    ON quant_data (
+        (COALESCE(NULLIF(btrim(institution), ''), 'Unnamed')),
+        (COALESCE(NULLIF(btrim(computer), ''), 'Unnamed')),
+        ((EXTRACT(YEAR FROM date))::int)
+    )
+    WHERE status = 'APPROVED';
+
+CREATE INDEX IF NOT EXISTS quant_data_approved_year_idx
+    ON quant_data (((EXTRACT(YEAR FROM date))::int))
+    WHERE status = 'APPROVED';
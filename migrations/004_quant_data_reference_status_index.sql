@@ -0,0 +1,5 @@
+-- Index backing the approval of update requests (moderation.APPROVE_QUERY),
+-- which replaces the APPROVED row with the same reference.
+
+CREATE INDEX IF NOT EXISTS quant_data_reference_status_idx
+    ON quant_data (reference, status);
@@ -0,0 +1,13 @@
+-- Indexes for the remaining hot access paths, verified by
+-- benchmarks/check_query_plans.py:
+--   * the moderation queue (status IN ('PENDING', 'UPDATE REQUESTED'), newest first)
+--   * the admin credential lookup on admin_users(username)
+-- The Visualization filters are covered by 003, the update-request swap on
+-- reference by 004, and single-row lookups by the primary key.
+
+CREATE INDEX IF NOT EXISTS quant_data_pending_id_idx
+    ON quant_data (id DESC)
+    WHERE status IN ('PENDING', 'UPDATE REQUESTED');
+
+CREATE INDEX IF NOT EXISTS admin_users_username_idx
+    ON admin_users (username);
@@ -0,0 +1,33 @@
+-- The approved dataset in display shape (DB_APPROVED_VIEW=1), so loading it is
+-- a plain fetch instead of running transform_db_data on every read.
+-- Columns and values must match transform_db_data in data_ingestion.py; the
+-- Institution / Computer / Year expressions match FILTER_EXPRESSIONS.
+--
+-- The view is refreshed CONCURRENTLY (moderation.refresh_approved_view) after
+-- every committed write that can change the approved rows, which needs the
+-- unique index on id.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS approved_view AS
+SELECT
+    id,
+    reference AS "Reference",
+    date AS "Date",
+    computation AS "Computation",
+    num_qubits AS "Number of qubits",
+    num_2q_gates AS "Number of two-qubit gates",
+    num_1q_gates AS "Number of single-qubit gates",
+    total_gates AS "Total number of gates",
+    circuit_depth AS "Circuit depth",
+    circuit_depth_measure AS "Circuit depth measure",
+    COALESCE(NULLIF(btrim(institution), ''), 'Unnamed') AS "Institution",
+    COALESCE(NULLIF(btrim(computer), ''), 'Unnamed') AS "Computer",
+    feedback,
+    CASE WHEN jsonb_typeof(computation::jsonb) = 'array' THEN
+        COALESCE((SELECT string_agg(c, ', ' ORDER BY n)
+                  FROM jsonb_array_elements_text(computation::jsonb) WITH ORDINALITY AS e(c, n)), '')
+    ELSE '' END AS "Computations",
+    (EXTRACT(YEAR FROM date))::int AS "Year"
+FROM quant_data
+WHERE status = 'APPROVED';
+
+CREATE UNIQUE INDEX IF NOT EXISTS approved_view_id_idx ON approved_view (id);
@@ -0,0 +1,36 @@
+-- Indexes backing the admin "View Data Tables" grid
+-- (data_ingestion.load_table_page_from_db / count_table_rows_in_db).
+--   * one (sort key, id) index per sortable column, so every keyset page is an
+--     index range scan in either direction; the expressions must match
+--     TABLE_SORT_EXPRESSIONS in data_ingestion.py (id uses the primary key)
+--   * trigram indexes for the case-insensitive substring search on
+--     reference / institution / computer
+-- Verified by benchmarks/check_query_plans.py.
+
+CREATE INDEX IF NOT EXISTS quant_data_table_reference_idx
+    ON quant_data ((COALESCE(reference, '')), id);
+CREATE INDEX IF NOT EXISTS quant_data_table_date_idx
+    ON quant_data ((COALESCE(date, '0001-01-01'::date)), id);
+CREATE INDEX IF NOT EXISTS quant_data_table_num_qubits_idx
+    ON quant_data ((COALESCE(num_qubits, -1)), id);
+CREATE INDEX IF NOT EXISTS quant_data_table_num_2q_gates_idx
+    ON quant_data ((COALESCE(num_2q_gates, -1)), id);
+CREATE INDEX IF NOT EXISTS quant_data_table_total_gates_idx
+    ON quant_data ((COALESCE(total_gates, -1)), id);
+CREATE INDEX IF NOT EXISTS quant_data_table_circuit_depth_idx
+    ON quant_data ((COALESCE(circuit_depth, -1)), id);
+CREATE INDEX IF NOT EXISTS quant_data_table_institution_idx
+    ON quant_data ((COALESCE(institution, '')), id);
+CREATE INDEX IF NOT EXISTS quant_data_table_computer_idx
+    ON quant_data ((COALESCE(computer, '')), id);
+CREATE INDEX IF NOT EXISTS quant_data_table_status_idx
+    ON quant_data ((COALESCE(status, '')), id);
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS quant_data_reference_trgm_idx
+    ON quant_data USING gin (reference gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS quant_data_institution_trgm_idx
+    ON quant_data USING gin (institution gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS quant_data_computer_trgm_idx
+    ON quant_data USING gin (computer gin_trgm_ops);
@@ -0,0 +1,37 @@
+-- Commit-ordered change tracking for DB_REFRESH_MODE=incremental (PostgreSQL 13+).
+--
+-- updated_at (001) is stamped when a row is written, not when its transaction
+-- commits, so a sync mark based on it misses transactions that commit late.
+-- Rows and tombstones now also record the id of the transaction that wrote
+-- them. A sync reads the xmin of the current snapshot as its next mark: every
+-- transaction below it has finished, so its rows are visible to the sync, and
+-- anything still running gets an id at or above the mark and is fetched by the
+-- next sync (see data_ingestion.load_changes_from_db).
+
+ALTER TABLE quant_data
+    ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT '0';
+
+CREATE INDEX IF NOT EXISTS quant_data_change_xid_idx ON quant_data (change_xid);
+
+ALTER TABLE quant_data_tombstones
+    ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT '0';
+
+CREATE INDEX IF NOT EXISTS quant_data_tombstones_change_xid_idx
+    ON quant_data_tombstones (change_xid);
+
+CREATE OR REPLACE FUNCTION quant_data_touch() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := clock_timestamp();
+    NEW.change_xid := pg_current_xact_id();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION quant_data_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO quant_data_tombstones (id, change_xid) VALUES (OLD.id, pg_current_xact_id())
+    ON CONFLICT (id) DO UPDATE
+        SET deleted_at = clock_timestamp(), change_xid = EXCLUDED.change_xid;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,49 @@
+-- Institution / Computer trimming that matches Python's str.strip().
+--
+-- btrim(x) only removes spaces, while transform_db_data strips every whitespace
+-- character, so a name ending in a tab or newline was filtered and grouped
+-- differently by FILTER_MODE=sql and DB_APPROVED_VIEW=1 than by the pandas
+-- path. strip_whitespace() removes the characters str.isspace() accepts; the
+-- filter index (003) and approved_view (006) are rebuilt on it, and
+-- FILTER_EXPRESSIONS in data_ingestion.py uses it too. Needs a UTF8 database.
+
+CREATE OR REPLACE FUNCTION strip_whitespace(value text) RETURNS text AS $$
+    SELECT btrim(value, E' \t\n\x0b\f\r\x1c\x1d\x1e\x1f\u0085\u00a0\u1680'
+                        || E'\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a'
+                        || E'\u2028\u2029\u202f\u205f\u3000');
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+
+DROP INDEX IF EXISTS quant_data_approved_filters_idx;
+CREATE INDEX quant_data_approved_filters_idx
+    ON quant_data (
+        (COALESCE(NULLIF(strip_whitespace(institution), ''), 'Unnamed')),
+        (COALESCE(NULLIF(strip_whitespace(computer), ''), 'Unnamed')),
+        ((EXTRACT(YEAR FROM date))::int)
+    )
+    WHERE status = 'APPROVED';
+
+DROP MATERIALIZED VIEW IF EXISTS approved_view;
+CREATE MATERIALIZED VIEW approved_view AS
+SELECT
+    id,
+    reference AS "Reference",
+    date AS "Date",
+    computation AS "Computation",
+    num_qubits AS "Number of qubits",
+    num_2q_gates AS "Number of two-qubit gates",
+    num_1q_gates AS "Number of single-qubit gates",
+    total_gates AS "Total number of gates",
+    circuit_depth AS "Circuit depth",
+    circuit_depth_measure AS "Circuit depth measure",
+    COALESCE(NULLIF(strip_whitespace(institution), ''), 'Unnamed') AS "Institution",
+    COALESCE(NULLIF(strip_whitespace(computer), ''), 'Unnamed') AS "Computer",
+    feedback,
+    CASE WHEN jsonb_typeof(computation::jsonb) = 'array' THEN
+        COALESCE((SELECT string_agg(c, ', ' ORDER BY n)
+                  FROM jsonb_array_elements_text(computation::jsonb) WITH ORDINALITY AS e(c, n)), '')
+    ELSE '' END AS "Computations",
+    (EXTRACT(YEAR FROM date))::int AS "Year"
+FROM quant_data
+WHERE status = 'APPROVED';
+
+CREATE UNIQUE INDEX approved_view_id_idx ON approved_view (id);
@@ -0,0 +1,178 @@
+# Import necessary libraries
+import time
+import logging
+import threading
+import psycopg2
+from psycopg2.extensions import connection as PGConnection
+from data_ingestion import PENDING_STATUSES, approved_view_mode
+from db import pooled_connection
+from notifications import CHANNEL
+
+# Setting up logger object for console logging
+logger = logging.getLogger("moderation")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+# New submissions are approved as they are. An approved update request replaces
+# the approved row with the same reference (found through the (reference, status)
+# index of migrations/004) in the same statement, so readers see either the old
+# or the new row, never neither. When several update requests for one reference
+# are selected only the newest is applied, the others stay queued.
+#
+# The selected rows are locked: a moderator approving the same rows concurrently
+# waits, then finds them no longer queued and skips them.
+# One submission per reference is approved per batch: an update request wins
+# over a new submission, then the newest id; the others stay queued.
+APPROVE_QUERY = """
+WITH selected AS (
+    SELECT id, reference, status FROM quant_data
+    WHERE id = ANY(%(ids)s) AND status = ANY(%(statuses)s)
+    FOR UPDATE
+), ranked AS (
+    SELECT id, reference, status,
+           row_number() OVER (PARTITION BY reference
+                              ORDER BY status = 'UPDATE REQUESTED' DESC, id DESC) AS n
+    FROM selected
+), chosen AS (
+    SELECT id, reference, status FROM ranked
+    WHERE n = 1 OR reference IS NULL
+), replaced AS (
+    DELETE FROM quant_data q USING chosen c
+    WHERE c.status = 'UPDATE REQUESTED' AND q.reference = c.reference AND q.status = 'APPROVED'
+)
+UPDATE quant_data SET status = 'APPROVED'
+WHERE id IN (SELECT id FROM chosen)
+    AND status = ANY(%(statuses)s)
+RETURNING id;
+"""
+
+# Seconds before refresh_approved_view_on_start tries again after a failure
+RETRY_AFTER = 30.0
+
+_refreshed_on_start = False
+_next_attempt = 0.0
+_start_lock = threading.Lock()
+
+REJECT_QUERY = """
+DELETE FROM quant_data
+WHERE id = ANY(%(ids)s) AND status = ANY(%(statuses)s)
+RETURNING id;
+"""
+
+
+def refresh_approved_view(conn: PGConnection) -> bool:
+    """
+    Refreshes the approved_view materialized view (migrations/006) after a
+    committed write, when DB_APPROVED_VIEW is enabled.
+
+    The refresh is CONCURRENT, so readers keep getting the previous contents
+    meanwhile; it cannot run inside a transaction, hence the autocommit switch.
+    A failure is logged rather than raised since the write itself has already
+    committed; the next successful refresh catches up.
+
+    Args:
+        conn (PGConnection): Open database connection with no transaction in progress.
+
+    Returns:
+        bool: True if the view was refreshed.
+    """
+    if not approved_view_mode():
+        return False
+    autocommit = conn.autocommit
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY approved_view;")
+            # Workers that reloaded on the write's own notification may have read the old view
+            cur.execute("SELECT pg_notify(%s, %s);", (CHANNEL, '{"op": "REFRESH", "view": "approved_view"}'))
+    except psycopg2.Error as e:
+        logger.error('Refreshing approved_view failed: %s', e)
+        return False
+    finally:
+        conn.autocommit = autocommit
+    logger.debug('Refreshed approved_view')
+    return True
+
+def refresh_approved_view_on_start() -> bool:
+    """
+    Refreshes approved_view once per process when DB_APPROVED_VIEW is enabled.
+
+    Writes only refresh the view while the flag is on, so a view left behind
+    while it was off is out of date; this brings it current before the first
+    load reads it. A failure (e.g. the database is unreachable) is retried on a
+    run at least RETRY_AFTER seconds later.
+
+    Returns:
+        bool: True once the view has been refreshed in this process.
+    """
+    global _refreshed_on_start, _next_attempt
+    if not approved_view_mode():
+        return False
+    with _start_lock:
+        if _refreshed_on_start:
+            return True
+        if time.monotonic() < _next_attempt:
+            return False
+        try:
+            with pooled_connection() as conn:
+                refreshed = refresh_approved_view(conn)
+        except (psycopg2.Error, OSError) as e:
+            logger.error('Could not refresh approved_view on start: %s', e)
+            refreshed = False
+        if not refreshed:
+            _next_attempt = time.monotonic() + RETRY_AFTER
+            return False
+        _refreshed_on_start = True
+        return True
+
+def _moderate(conn: PGConnection, query: str, ids: list[int]) -> list[int]:
+    params = {'ids': [int(i) for i in ids], 'statuses': PENDING_STATUSES}
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            done = [row[0] for row in cur.fetchall()]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if done:
+        refresh_approved_view(conn)
+    return done
+
+def approve_submissions(conn: PGConnection, ids: list[int]) -> list[int]:
+    """
+    Approves queued submissions in a single statement and transaction.
+
+    Args:
+        conn (PGConnection): Open database connection.
+        ids (list[int]): ids of PENDING / UPDATE REQUESTED rows.
+
+    Returns:
+        list[int]: ids actually approved. Rows no longer queued are skipped, as
+        are all but one row per reference (see APPROVE_QUERY).
+    """
+    approved = _moderate(conn, APPROVE_QUERY, ids)
+    logger.debug('Approved %s of %s submission(s)', len(approved), len(ids))
+    return approved
+
+def reject_submissions(conn: PGConnection, ids: list[int]) -> list[int]:
+    """
+    Deletes queued submissions in a single statement and transaction.
+
+    Args:
+        conn (PGConnection): Open database connection.
+        ids (list[int]): ids of PENDING / UPDATE REQUESTED rows.
+
+    Returns:
+        list[int]: ids actually rejected.
+    """
+    rejected = _moderate(conn, REJECT_QUERY, ids)
+    logger.debug('Rejected %s of %s submission(s)', len(rejected), len(ids))
+    return rejected
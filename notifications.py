@@ -0,0 +1,99 @@
+# Import necessary libraries
+import os
+import time
+import select
+import logging
+import threading
+import psycopg2
+from db import connect, get_pool
+from dataset_cache import bump_dataset_version
+
+# Setting up logger object for console logging
+logger = logging.getLogger("notifications")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+# Channel written by the trigger in migrations/002_quant_data_notify.sql
+CHANNEL = "quant_data_changed"
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def listen_enabled() -> bool:
+    """
+    The background listener runs when DB_LISTEN is set to 1/true.
+    """
+    return os.getenv("DB_LISTEN", "0").strip().lower() in ("1", "true", "yes")
+
+def _handle(notifies: list) -> None:
+    """
+    Invalidates the cached dataset and pending queue once per batch of notifications.
+
+    Notifications sent from this process's own pooled connections are skipped:
+    the write that caused them already bumped the dataset version here.
+    """
+    own = get_pool().backend_pids()
+    foreign = [notify for notify in notifies if notify.pid not in own]
+    if not foreign:
+        logger.debug('Skipped %s change notification(s) from this process', len(notifies))
+        return
+    version = bump_dataset_version()
+    logger.debug('Received %s change notification(s) (%s from this process), dataset version now %s',
+                 len(notifies), len(notifies) - len(foreign), version)
+
+def _listen_forever(poll_timeout: float = 5.0, max_backoff: float = 30.0) -> None:
+    """
+    Holds a dedicated LISTEN connection open, reconnecting with exponential backoff.
+
+    The connection does not come from the pool because it is never returned.
+    """
+    backoff = 1.0
+    while True:
+        conn = None
+        try:
+            conn = connect()
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL};")
+            logger.debug('Listening on %s', CHANNEL)
+            # Anything committed while we were disconnected was missed
+            bump_dataset_version()
+            backoff = 1.0
+
+            while True:
+                if select.select([conn], [], [], poll_timeout) == ([], [], []):
+                    continue
+                conn.poll()
+                if conn.notifies:
+                    notifies, conn.notifies[:] = list(conn.notifies), []
+                    _handle(notifies)
+
+        except Exception as e:
+            logger.error('Notification listener failed: %s', e)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, max_backoff)
+        finally:
+            if conn is not None and not conn.closed:
+                conn.close()
+
+def start_listener() -> threading.Thread:
+    """
+    Starts the process-wide notification listener thread if it is not running yet.
+
+    Returns:
+        threading.Thread: The listener thread.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = threading.Thread(target=_listen_forever, name="quant-data-listener", daemon=True)
+            _listener.start()
+    return _listener
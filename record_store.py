@@ -0,0 +1,92 @@
+# Import necessary libraries
+import logging
+import threading
+from collections import OrderedDict
+import pandas as pd
+from db import pooled_connection
+from data_ingestion import load_record_from_db, transform_db_data
+
+# Setting up logger object for console logging
+logger = logging.getLogger("record_store")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+# dataset key -> (id index, frame, rows fetched on a miss), least recently used first
+STORE_SIZE = 4
+_stores = OrderedDict()
+_lock = threading.Lock()
+
+
+def _store_for(df: pd.DataFrame) -> tuple | None:
+    """
+    Returns the id index of a dataset, building it on first use.
+    """
+    dataset_key = df.attrs.get("dataset_key")
+    if dataset_key is None:
+        return None
+    with _lock:
+        if dataset_key in _stores:
+            _stores.move_to_end(dataset_key)
+            return _stores[dataset_key]
+
+    store = (pd.Index(df['id']), df, {})
+    with _lock:
+        store = _stores.setdefault(dataset_key, store)
+        while len(_stores) > STORE_SIZE:
+            _stores.popitem(last=False)
+    return store
+
+def _fetch_record(record_id: int) -> dict | None:
+    """
+    Reads one approved row straight from the database.
+    """
+    with pooled_connection() as conn:
+        raw = load_record_from_db(conn, record_id)
+    if raw.empty:
+        return None
+    logger.debug('Fetched record %s from the database', record_id)
+    return transform_db_data(raw).iloc[0].to_dict()
+
+def get_record(df: pd.DataFrame, record_id) -> dict | None:
+    """
+    Returns the row of `df` with the given id, as a column -> value dict.
+
+    Lookups go through a hash index on id built once per dataset version
+    (see dataset_cache), so they cost the same whatever the table size. Ids
+    missing from a database-backed dataset (e.g. approved since it was
+    loaded) are fetched with a single-row query and remembered.
+
+    Args:
+        df (pd.DataFrame): The transformed dataset the id comes from.
+        record_id: quant_data id.
+
+    Returns:
+        dict | None: The record, or None if there is no such approved row.
+    """
+    if record_id is None:
+        return None
+    store = _store_for(df)
+    if store is None:
+        record = df[df['id'] == record_id]
+        return record.iloc[0].to_dict() if not record.empty else None
+
+    ids, frame, fetched = store
+    if record_id in ids:
+        position = ids.get_loc(record_id)
+        if isinstance(position, int):
+            return frame.iloc[position].to_dict()
+        # Duplicate ids: first match, as the boolean filter did
+        return frame[position].iloc[0].to_dict()
+
+    if frame.attrs["dataset_key"][0] == 'sheet':
+        return None
+    if record_id not in fetched:
+        fetched[record_id] = _fetch_record(record_id)
+    return fetched[record_id]
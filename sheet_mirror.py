@@ -0,0 +1,173 @@
+# Import necessary libraries
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import urllib.request
+import urllib.error
+import pandas as pd
+
+# Setting up logger object for console logging
+logger = logging.getLogger("sheet_mirror")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+DEFAULT_EXPORT_URL = "https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=xlsx"
+
+# (sheet_id, frame name) -> (content hash, parsed frame), so repeated loads skip the disk too
+_parsed = {}
+_lock = threading.Lock()
+# Serializes read-modify-write of meta.json within the process
+_meta_lock = threading.Lock()
+
+
+def export_url(sheet_id: str) -> str:
+    """
+    URL of the xlsx export of a sheet. SHEET_EXPORT_URL overrides the Google
+    endpoint (with a {sheet_id} placeholder), e.g. to point at a local HTTP server.
+    """
+    return os.getenv("SHEET_EXPORT_URL", DEFAULT_EXPORT_URL).format(sheet_id=sheet_id)
+
+def _mirror_dir(sheet_id: str) -> str:
+    root = os.getenv("SHEET_CACHE_DIR", ".sheet_cache")
+    safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in sheet_id)
+    return os.path.join(root, safe_id)
+
+def _read_meta(directory: str) -> dict:
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _replace_atomic(path: str, write) -> None:
+    """
+    Calls `write(file)` on a uniquely named temporary file next to `path` and
+    moves it into place, so concurrent writers never share a partial file.
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp",
+                                    dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _write_atomic(path: str, data: bytes) -> None:
+    _replace_atomic(path, lambda f: f.write(data))
+
+def _update_meta(directory: str, changes: dict) -> None:
+    """
+    Merges `changes` into meta.json, re-reading it so other keys written meanwhile are kept.
+    """
+    with _meta_lock:
+        meta = {**_read_meta(directory), **changes}
+        _write_atomic(os.path.join(directory, "meta.json"), json.dumps(meta).encode())
+
+def fetch_workbook(sheet_id: str, timeout: float = 30.0) -> tuple[bytes, str]:
+    """
+    Returns the xlsx export of a sheet, revalidating the local mirror with a
+    conditional request (If-None-Match / If-Modified-Since).
+
+    On 304 Not Modified the mirrored bytes are used. If the request fails and
+    a mirror exists, the mirror is served with a warning.
+
+    Args:
+        sheet_id (str): Google Sheet id.
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        tuple: The workbook bytes and their SHA-256 hex digest.
+    """
+    directory = _mirror_dir(sheet_id)
+    raw_path = os.path.join(directory, "raw.xlsx")
+    meta = _read_meta(directory)
+    have_mirror = bool(meta) and os.path.exists(raw_path)
+
+    request = urllib.request.Request(export_url(sheet_id))
+    if have_mirror:
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            raw = response.read()
+            headers = response.headers
+    except OSError as e:
+        # urllib reports 304 Not Modified as an HTTPError
+        if isinstance(e, urllib.error.HTTPError) and e.code == 304 and have_mirror:
+            logger.debug('Sheet %s not modified', sheet_id)
+        elif have_mirror:
+            logger.warning('Sheet export failed (%s), serving mirrored copy', e)
+        else:
+            raise
+        with open(raw_path, "rb") as f:
+            return f.read(), meta["sha256"]
+
+    digest = hashlib.sha256(raw).hexdigest()
+    os.makedirs(directory, exist_ok=True)
+    if digest != meta.get("sha256") or not have_mirror:
+        _write_atomic(raw_path, raw)
+    # parsed_sha256 / parsed_options are kept: they still tell whether the stored parsed frame matches
+    _update_meta(directory, {
+        "sha256": digest,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+    })
+    logger.debug('Downloaded sheet %s (%s bytes)', sheet_id, len(raw))
+    return raw, digest
+
+def load_parsed(sheet_id: str, digest: str, name: str = "data", options: str = "") -> pd.DataFrame | None:
+    """
+    Returns the frame `name` parsed from this exact workbook content, if stored.
+
+    `options` identifies how the frame was parsed (parser version, column
+    selection); a frame stored with other options is not returned.
+    """
+    key = (sheet_id, name)
+    with _lock:
+        if key in _parsed and _parsed[key][0] == (digest, options):
+            return _parsed[key][1].copy()
+
+    directory = _mirror_dir(sheet_id)
+    meta = _read_meta(directory)
+    if meta.get(f"parsed_sha256_{name}") != digest or meta.get(f"parsed_options_{name}", "") != options:
+        return None
+    try:
+        # Pickle keeps the duplicate column names and mixed-type cells of the sheet as-is
+        df = pd.read_pickle(os.path.join(directory, f"parsed_{name}.pkl"))
+    except (FileNotFoundError, ValueError) as e:
+        logger.debug('No usable parsed copy of sheet %s: %s', sheet_id, e)
+        return None
+    with _lock:
+        _parsed[key] = ((digest, options), df)
+    return df.copy()
+
+def store_parsed(sheet_id: str, digest: str, df: pd.DataFrame, name: str = "data", options: str = "") -> None:
+    """
+    Stores the frame `name` parsed from a workbook (with `options`) next to its raw bytes.
+    """
+    directory = _mirror_dir(sheet_id)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"parsed_{name}.pkl")
+        _replace_atomic(path, df.to_pickle)
+        _update_meta(directory, {f"parsed_sha256_{name}": digest, f"parsed_options_{name}": options})
+    except OSError as e:
+        logger.error('Could not store parsed sheet %s: %s', sheet_id, e)
+    with _lock:
+        _parsed[(sheet_id, name)] = ((digest, options), df.copy())
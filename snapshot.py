@@ -0,0 +1,146 @@
+# Import necessary libraries
+import os
+import json
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+# Setting up logger object for console logging
+logger = logging.getLogger("snapshot")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+# Bump when the layout of the transformed dataset changes so old snapshots are ignored
+SNAPSHOT_FORMAT = 4
+
+# Parquet schema-metadata key holding the version stamp
+STAMP_KEY = b"snapshot_stamp"
+
+# Serializes saves within the process; creation time of the newest snapshot written per source
+_save_lock = threading.Lock()
+_saved_at = {}
+
+
+def snapshot_dir() -> str | None:
+    """
+    Directory holding the dataset snapshots (SNAPSHOT_DIR, default '.snapshots').
+    Setting SNAPSHOT_DIR to an empty string disables snapshots.
+    """
+    path = os.getenv("SNAPSHOT_DIR", ".snapshots").strip()
+    return path or None
+
+def _path(data_source: str) -> str | None:
+    directory = snapshot_dir()
+    if directory is None:
+        return None
+    return os.path.join(directory, f"{data_source}.parquet")
+
+def save_snapshot(data_source: str, df: pd.DataFrame, hwm=None) -> bool:
+    """
+    Persists a transformed dataset as Parquet, with its version stamp in the
+    file's schema metadata.
+
+    The file is written under a unique temporary name and moved into place, so
+    a reader never sees a half-written snapshot and the data and its stamp
+    (including the high-water mark) are always replaced together. Saves in one
+    process are serialized and an older dataset never replaces a newer one;
+    workers sharing the directory each publish whole files.
+
+    Args:
+        data_source (str): 'db' or 'sheet'.
+        df (pd.DataFrame): The transformed dataset.
+        hwm: Incremental-sync high-water mark the dataset is current to, if any.
+
+    Returns:
+        bool: True if the snapshot was written.
+    """
+    path = _path(data_source)
+    if path is None:
+        return False
+    created_at = datetime.now(timezone.utc)
+    stamp = {
+        "format": SNAPSHOT_FORMAT,
+        "data_source": data_source,
+        "rows": int(len(df)),
+        "created_at": created_at.isoformat(),
+        "hwm": int(hwm) if hwm is not None else None,
+    }
+    tmp_path = None
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[STAMP_KEY] = json.dumps(stamp).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with _save_lock:
+            if _saved_at.get(data_source, created_at) > created_at:
+                logger.debug('Skipping %s snapshot superseded by a newer one', data_source)
+                return False
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{data_source}.", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, "wb") as f:
+                pq.write_table(table, f)
+            os.replace(tmp_path, path)
+            tmp_path = None
+            _saved_at[data_source] = created_at
+        logger.debug('Saved %s snapshot (%s rows)', data_source, stamp["rows"])
+        return True
+    except Exception as e:
+        logger.error('Could not save %s snapshot: %s', data_source, e)
+        return False
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _restore_lists(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parquet hands list columns back as numpy arrays; turn them back into lists
+    so the frame serializes to JSON exactly like a freshly loaded one.
+    """
+    for col in df.columns[df.dtypes == object]:
+        sample = df[col].dropna()
+        if not sample.empty and isinstance(sample.iloc[0], np.ndarray):
+            df[col] = df[col].map(lambda x: x.tolist() if isinstance(x, np.ndarray) else x)
+    return df
+
+def load_snapshot(data_source: str) -> tuple[pd.DataFrame, dict] | None:
+    """
+    Loads the last snapshot written for `data_source`.
+
+    Returns:
+        tuple | None: (dataset, version stamp), or None when there is no usable snapshot.
+    """
+    path = _path(data_source)
+    if path is None:
+        return None
+    try:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        raw_stamp = (table.schema.metadata or {}).get(STAMP_KEY)
+        stamp = json.loads(raw_stamp) if raw_stamp else {}
+        if stamp.get("format") != SNAPSHOT_FORMAT:
+            logger.debug('Ignoring %s snapshot with format %s', data_source, stamp.get("format"))
+            return None
+        df = _restore_lists(table.to_pandas())
+        logger.debug('Loaded %s snapshot from %s (%s rows)', data_source, stamp["created_at"], len(df))
+        return df, stamp
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error('Could not load %s snapshot: %s', data_source, e)
+        return None
@@ -0,0 +1,96 @@
+# Import necessary libraries
+import os
+import sys
+import time
+import logging
+import importlib
+import threading
+from contextlib import contextmanager
+
+# Setting up logger object for console logging
+logger = logging.getLogger("startup")
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.DEBUG)
+
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+
+logger.addHandler(console_handler)
+
+# Stage name -> seconds, in the order the stages were first recorded
+_timings = {}
+_lock = threading.Lock()
+
+
+def lazy_mode() -> bool:
+    """
+    Lazy initialization is on unless LAZY_INIT is set to 0/false.
+    """
+    return os.getenv("LAZY_INIT", "1").strip().lower() not in ("0", "false", "no")
+
+def report_enabled() -> bool:
+    """
+    The startup report is shown in the sidebar when STARTUP_REPORT is set to 1/true.
+    """
+    return os.getenv("STARTUP_REPORT", "0").strip().lower() in ("1", "true", "yes")
+
+def record_once(stage: str, seconds: float) -> None:
+    """
+    Records the duration of a startup stage. Only the first measurement of a
+    stage is kept, so reruns of the Streamlit script do not overwrite the
+    cold-start numbers.
+    """
+    with _lock:
+        if stage not in _timings:
+            _timings[stage] = seconds
+            logger.debug('Startup stage %s took %.1f ms', stage, seconds * 1000)
+
+@contextmanager
+def timed_once(stage: str):
+    """
+    Context manager recording the wall time of the wrapped block under `stage`
+    the first time it runs in this process.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_once(stage, time.perf_counter() - start)
+
+def lazy_import(module_name: str):
+    """
+    Imports a module on first use and records how long the import took.
+
+    Args:
+        module_name (str): Dotted module path, e.g. 'streamlit_echarts'.
+
+    Returns:
+        module: The imported module.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    with timed_once(f"import {module_name}"):
+        module = importlib.import_module(module_name)
+    return module
+
+def preload(module_names: list[str]) -> None:
+    """
+    Eagerly imports the given modules when lazy initialization is switched off.
+    """
+    if lazy_mode():
+        return
+    for module_name in module_names:
+        lazy_import(module_name)
+
+def startup_report() -> list[dict]:
+    """
+    Returns the recorded startup stages as rows of {'stage', 'ms'}.
+    """
+    with _lock:
+        return [
+            {"stage": stage, "ms": round(seconds * 1000, 1)}
+            for stage, seconds in _timings.items()
+        ]